@@ -0,0 +1,295 @@
+#! /usr/bin/env python3
+
+"""
+The generators toolkit as async generators, for use on an asyncio loop.
+
+Wherever an async it is taken, a plain iterable is also accepted, see
+toAsync.
+"""
+
+import asyncio
+from collections import deque
+from heapq import heapify, heappop, heapreplace
+from inspect import iscoroutinefunction
+from math import cos, pi
+
+import generators
+
+#
+# Adapters
+#
+
+async def toAsync(it, thread=False):
+    """
+    Make an async it of an iterable.
+
+    If thread, each value is taken in a worker thread, so an it which
+    blocks, e.g. on a file or socket, doesn't stall the loop.
+    """
+    if thread:
+        it = iter(it)
+        while (el := await asyncio.to_thread(next, it, _end)) is not _end:
+            yield el
+    else:
+        for el in it:
+            yield el
+
+def toSync(ait):
+    """
+    Make an iterable of an async it, run on a loop of its own.
+
+    Not to be used from within a running loop, consume the async it
+    there instead.
+    """
+    loop = asyncio.new_event_loop()
+    ait = _aiter(ait)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(anext(ait))
+            except StopAsyncIteration:
+                break
+    finally:
+        if hasattr(ait, 'aclose'):
+            loop.run_until_complete(ait.aclose())
+        loop.close()
+
+def _aiter(it):
+    return aiter(it) if hasattr(it, '__aiter__') else toAsync(it)
+
+_end = object() # Marks an exhausted it
+
+#
+# Sources
+#
+
+async def birth(N, population=[0,1]):
+    """ From a population, generate a sample randomly. """
+    async for el in toAsync(generators.birth(N, population)):
+        yield el
+
+async def randAlph(N=1):
+    async for el in toAsync(generators.randAlph(N)):
+        yield el
+
+async def randColors(N=1):
+    async for el in toAsync(generators.randColors(N)):
+        yield el
+
+#
+# Modifiers
+#
+
+async def sleepy(it, T=0.5):
+    """
+    Cause a generator to be sleepy.
+
+    Yields values only after T seconds, sleeping with asyncio.sleep so
+    the other tasks of the loop run meanwhile.
+    """
+    async for el in _aiter(it):
+        await asyncio.sleep(T)
+        yield el
+
+async def periodic(it, period=4):
+    """ Return a periodic value of the index, see generators.periodic. """
+    i = 0
+    async for elm in _aiter(it):
+        yield cos((i % period)*pi/period), elm
+        i += 1
+
+async def printer(it):
+    """
+    The simplest printer genereator ever.
+    """
+    async for elm in _aiter(it):
+        print(elm)
+        yield elm
+
+async def expand(it, n, step=1, partial=False):
+    """
+    Expand the next n values, see generators.expand.
+
+    Windows are always tuples.
+    """
+    if n < 1 or step < 1:
+        raise ValueError('expand needs n and step of at least 1.')
+    it = _aiter(it)
+    window = deque(maxlen=n)
+    async for el in it:
+        window.append(el)
+        if len(window) == n:
+            break
+    tail = tuple(window)
+    if len(window) == n:
+        yield tail
+        skipped = 0
+        async for el in it:
+            window.append(el)
+            skipped += 1
+            if skipped == step:
+                yield tuple(window)
+                skipped = 0
+        tail = tuple(window)[step - skipped:]
+    while partial and tail:
+        yield tail
+        tail = tail[step:]
+
+async def warnLast(obj):
+    """
+    Generate, for its, a warning if you are at the last element.
+
+    See generators.warnLast.
+    """
+    it = _aiter(obj)
+    curr = await anext(it)
+    async for head in it:
+        yield (*curr, False) if isinstance(curr, tuple) else (curr, False)
+        curr = head
+    yield (*curr, True) if isinstance(curr, tuple) else (curr, True)
+
+#
+# Channels
+#
+
+class _Raised:
+    """An exception passed down a queue of pipe."""
+    __slots__ = ('exc',)
+
+    def __init__(self, exc):
+        self.exc = exc
+
+async def _pump(ait, queue):
+    try:
+        async for el in ait:
+            await queue.put(el)
+    except Exception as exc:
+        await queue.put(_Raised(exc))
+    else:
+        await queue.put(_end)
+
+async def _drain(queue):
+    while (el := await queue.get()) is not _end:
+        if isinstance(el, _Raised):
+            raise el.exc
+        yield el
+
+async def pipe(*gs, maxsize=16):
+    """
+    Take multiple (uninitialized) async generators and pipe them together.
+
+    First argument is the source. Each stage runs in a task of its own and
+    hands its values to the next through a queue holding at most maxsize,
+    so a slow stage holds back those before it. An exception in a stage
+    is raised to the consumer, and the tasks are cancelled when the pipe
+    is done or closed early.
+
+    Example
+    -------
+        pipe(f(...), g, h) -> h(g(f(...)))
+
+        Think of this like,
+        f(...) | g | h | ...
+    """
+    it, tasks = _aiter(gs[0]), []
+    try:
+        for g in gs[1:]:
+            queue = asyncio.Queue(maxsize)
+            tasks.append(asyncio.create_task(_pump(it, queue)))
+            it = g(_drain(queue))
+        async for el in it:
+            yield el
+    finally:
+        if hasattr(it, 'aclose'):
+            await it.aclose()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def purepipe(*gs, maxsize=16):
+    """
+    Much like pipe but doesn't expect a source in the beginning.
+
+    Example
+    -------
+        p = purepipe(f1, f2)
+        p(g(...)) -> f2(f1(g(...)))
+    """
+    return lambda g: pipe(g, *gs, maxsize=maxsize)
+
+def concurrentMap(fn, limit=8):
+    """
+    A stage yielding fn(el) for each el, with up to limit calls at a time.
+
+    fn is a coroutine function, or a plain function which is then run in a
+    worker thread. The values are yielded in order. An exception raised by
+    fn is raised to the consumer and the calls still running are
+    cancelled.
+
+    Example
+    -------
+        pipe(urls, concurrentMap(fetch, limit=100), printer)
+    """
+    call = fn if iscoroutinefunction(fn) else (lambda el: asyncio.to_thread(fn, el))
+
+    async def stage(it):
+        pending = deque()
+        try:
+            async for el in _aiter(it):
+                pending.append(asyncio.ensure_future(call(el)))
+                if len(pending) >= limit:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return stage
+
+async def meld(*gs):
+    """
+    Meld its to a single it with left-most argument priority.
+
+    See generators.meld. The its are advanced concurrently.
+    """
+    its = [_aiter(g) for g in gs]
+    while its:
+        heads = await asyncio.gather(*(anext(it, _end) for it in its))
+        its = [it for it, head in zip(its, heads) if head is not _end]
+        for head in heads:
+            if head is not _end:
+                yield head
+                break
+
+async def merge(*gs, key=None, unique=False):
+    """
+    Merge sorted its to a single sorted it with left-most argument priority.
+
+    See generators.merge.
+    """
+    key = key or (lambda el: el)
+    its = [_aiter(g) for g in gs]
+    heads = await asyncio.gather(*(anext(it, _end) for it in its))
+    heap = [(key(el), i, el, it) for i, (el, it) in enumerate(zip(heads, its))
+            if el is not _end]
+    heapify(heap)
+    last = _end
+    while heap:
+        k, i, el, it = heap[0]
+        if not unique or last is _end or k != last:
+            yield el
+        last = k
+        if (el := await anext(it, _end)) is _end:
+            heappop(heap)
+        else:
+            heapreplace(heap, (key(el), i, el, it))
+
+#
+# Sinks
+#
+
+async def sink(it):
+    async for _ in _aiter(it):
+        pass
@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+
+from unittest import IsolatedAsyncioTestCase, main
+from itertools import count
+import asyncio
+import time
+
+import asyncgenerators as ag
+import generators
+
+
+async def collect(ait):
+    return [el async for el in ait]
+
+async def inc(ait):
+    async for el in ait:
+        yield el + 1
+
+async def fails(ait):
+    async for el in ait:
+        if el == 3:
+            raise ValueError(el)
+        yield el
+
+
+class ADAPTERS(IsolatedAsyncioTestCase):
+    async def test(self):
+        self.assertEqual(await collect(ag.toAsync(range(3))), [0, 1, 2])
+        self.assertEqual(await collect(ag.toAsync(range(3), thread=True)), [0, 1, 2])
+
+    def test_sync(self):
+        self.assertEqual(list(ag.toSync(ag.sleepy(range(3), 0))), [0, 1, 2])
+        self.assertEqual(list(ag.toSync(range(2))), [0, 1])
+
+
+class MODIFIERS(IsolatedAsyncioTestCase):
+    async def test_sleepy(self):
+        # two sleepy streams of 5 x 20ms share the loop
+        start = time.perf_counter()
+        await asyncio.gather(ag.sink(ag.sleepy(range(5), 0.02)),
+                             ag.sink(ag.sleepy(range(5), 0.02)))
+        self.assertLess(time.perf_counter() - start, 0.18)
+
+    async def test_expand(self):
+        seq = list(range(10))
+        for n in range(1, 5):
+            for step in range(1, 6):
+                for partial in (False, True):
+                    with self.subTest(n=n, step=step, partial=partial):
+                        self.assertEqual(await collect(ag.expand(seq, n, step, partial)),
+                                         list(generators.expand(iter(seq), n, step, partial)))
+
+    async def test(self):
+        self.assertEqual(await collect(ag.periodic('ab', 2)), list(generators.periodic('ab', 2)))
+        self.assertEqual(await collect(ag.warnLast('abc')), list(generators.warnLast('abc')))
+        self.assertEqual(len(await collect(ag.randColors(3))), 3)
+
+
+class CHANNELS(IsolatedAsyncioTestCase):
+    async def test_pipe(self):
+        self.assertEqual(await collect(ag.pipe(range(5), inc, inc, maxsize=1)), [2, 3, 4, 5, 6])
+        p = ag.purepipe(inc)
+        self.assertEqual(await collect(p(ag.toAsync(''))), [])
+
+    async def test_pipe_exception(self):
+        with self.assertRaises(ValueError):
+            await collect(ag.pipe(range(5), fails, inc))
+
+    async def test_pipe_early_stop(self):
+        it = ag.pipe(ag.toAsync(count()), inc, maxsize=2)
+        self.assertEqual([await anext(it) for _ in range(3)], [1, 2, 3])
+        await it.aclose()
+        self.assertEqual(len(asyncio.all_tasks()), 1)
+
+    async def test_concurrent_map(self):
+        async def slow(el):
+            await asyncio.sleep(0.05 * (el % 2))
+            return -el
+        start = time.perf_counter()
+        stage = ag.concurrentMap(slow, limit=10)
+        self.assertEqual(await collect(ag.pipe(range(20), stage)), list(range(0, -20, -1)))
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(await collect(ag.concurrentMap(abs, 2)(range(0, -5, -1))), [0, 1, 2, 3, 4])
+
+    async def test_meld(self):
+        self.assertEqual(''.join(await collect(ag.meld('abcd', 'efghi', 'jkl', 'mnopqrs'))), 'abcdirs')
+
+    async def test_merge(self):
+        gs = [[1, 3, 5], [1, 2, 6], [], [0]]
+        self.assertEqual(await collect(ag.merge(*gs)), list(generators.merge(*gs)))
+        self.assertEqual(await collect(ag.merge(*gs, unique=True)), [0, 1, 2, 3, 5, 6])
+
+
+if __name__ == '__main__':
+    main()
@@ -2,44 +2,88 @@
 
 """
 TODO:
-    CRC
-        Read,
-        https://en.wikipedia.org/wiki/Cyclic_redundancy_check
-        for similar project,
-        https://en.wikipedia.org/wiki/Fletcher%27s_checksum
-    Hamming code
     Revisit BinT
     Overflow problems of blis?
-    blis from/to bytes
-    blis setitem is suboptimal
 """
 
-from numbers import Integral
+import binascii
+import math
+import mmap
+import operator
+import os
+import struct
+import sys
+import zlib
+from array import array
+from copy import copy
+from functools import lru_cache, partial
+from itertools import accumulate
+from numbers import Integral, Real
 from collections.abc import MutableSequence
+from time import time
 from observation import isiterable
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-def ispower2(x):
-    if x == 0:
-        return -1
-    elif x == 1:
-        return 0
-    elif x % 2:
-        return -1
-    else:
-        return ispower2(x // 2) + 1 or -1
 
-def ceilpow2(x, i=0):
-    if 2**i < x:
-        return ceilpow2(x, i+1)
-    return i
-
-def floorpow2(x, i=0):
-    if 2**i <= x:
-        if r := floorpow2(x, i+1):
-            return r
-        return i
-    return None
+def ispower2(x):
+    """Return n if x == 2**n, else -1."""
+    x = int(x) if x == int(x) else 0
+    return x.bit_length() - 1 if x > 0 and not x & (x - 1) else -1
+
+def ceilpow2(x):
+    """Return the smallest n >= 0 such that 2**n >= x."""
+    x = math.ceil(x)
+    return (x - 1).bit_length() if x > 1 else 0
+
+def floorpow2(x):
+    """Return the largest n such that 2**n <= x, None if x < 1."""
+    x = math.floor(x)
+    return x.bit_length() - 1 if x >= 1 else None
+
+# The *Many functions take numpy arrays of ints and return arrays of np.intp,
+# -1 takes the place of None.
+
+def ispower2Many(a):
+    a = _asintarray(a)
+    ispow = (a > 0) & (a & (a - 1) == 0)
+    return np.where(ispow, _bitlengthMany(a) - 1, -1)
+
+def ceilpow2Many(a):
+    a = _asintarray(a)
+    return np.where(a > 1, _bitlengthMany(np.maximum(a, 1) - 1), 0)
+
+def floorpow2Many(a):
+    a = _asintarray(a)
+    return np.where(a >= 1, _bitlengthMany(np.maximum(a, 0)) - 1, -1)
+
+def _asintarray(a):
+    if np is None:
+        raise ImportError('The batch operations requires numpy.')
+    a = np.asarray(a)
+    if a.dtype.kind not in 'ui':
+        raise TypeError(f'Expected an array of ints, not {a.dtype}.')
+    return a
+
+def _popcountMany(a):
+    """Number of high bits of each element of an array of non-negative ints."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(a).astype(np.intp)
+    # numpy < 2, count each byte with a table
+    table = np.array([i.bit_count() for i in range(256)], dtype=np.intp)
+    a = np.ascontiguousarray(a)
+    return table[a.view(np.uint8)].reshape(*a.shape, a.itemsize).sum(axis=-1)
+
+def _bitlengthMany(a):
+    """Bit length of each element of an array of non-negative ints."""
+    # smear the highest high bit downwards, then count
+    for i in (1, 2, 4, 8, 16, 32):
+        if i < a.itemsize * 8:
+            a = a | a >> a.dtype.type(i)
+    return _popcountMany(a)
 
 def makeargblis(func):
     def wrapper(self, other):
@@ -50,6 +94,11 @@ def makeargblis(func):
 
 
 class blis(Integral, MutableSequence):
+
+    # The bits are stored as one unsigned int (_value) of width _nbits. Bit i
+    # of _value is index i of the list, i.e. index 0 -> LSB.
+    __slots__ = ('_value', '_nbits')
+
     def __init__(self, *args):
         """
         Create a binary list of either an integer or iterable bools.
@@ -71,53 +120,28 @@ class blis(Integral, MutableSequence):
                 nbits - int
         """
 
-        self.bits = []
+        self._value = 0
+        self._nbits = 0
 
-        def from_value(val, nbits=None):
-            neg = val < 0
-            val = abs(val)
-            
-            if val == 0:
-                nbits = nbits or 8
-                self.bits = [0]*nbits
-                return
-
-            il = []
-            while val:
-                il.append(floorpow2(val))
-                val -= 2**il[-1]
-            m = max(il) + 2 # plus 2 because of zero indexing and one more for two's compl.
-            nbits = nbits or max(m, 8)
-            assert nbits > 0, 'nbits must be positive.'
-            self.bits = [0]*nbits
-            for i in il:
-                if i < nbits:
-                    self.bits[i] = 1
-            if neg:
-                self.negate()
- 
         def from_sequence(seq, nbits=None):
             nbits = nbits or len(seq)
             assert nbits > 0, 'nbits must be positive.'
+            if isinstance(seq, blis):
+                # already validated, copy straight from the int
+                self._nbits = nbits
+                self._value = seq._value & self.mask
+                return
+            digits = []
             for elm in seq:
                 if type(elm) not in (bool, int):
                     raise TypeError(f'Expected elements of type bool, not {type(elm)}')
                 if int(elm) not in (1, 0):
                     raise TypeError(f'Expected element to be one either [True, False, 1, 0], '
                                     f'not {elm}')
-                self.bits.append(int(elm))
-
-            self.bits = self.bits[:nbits] # if smaller nbits
-            while len(self.bits) < nbits: # if larger nbits
-                self.bits.append(0)
-
-        def from_string(string, nbits=None):
-            s = reversed(string)
-            m = map(lambda x: int(x), s)
-            l = list(m)
-            for i in l:
-                assert i in [0,1], 'int must be either 0 or 1.'
-            from_sequence(l, nbits=nbits)
+                digits.append('1' if elm else '0')
+            self._nbits = nbits
+            # if smaller nbits then mask, if larger then leading bits are zero
+            self._value = int(''.join(reversed(digits)) or '0', 2) & self.mask
 
         if not args:
             return
@@ -126,10 +150,10 @@ class blis(Integral, MutableSequence):
             raise TypeError(f'Expected at most 2 arguments, not {len(args)}.')
 
         elif type(args[0]) is int:
-            from_value(*args)
+            self._setint(*args)
 
         elif type(args[0]) is str:
-            from_string(*args)
+            self._setstring(*args)
 
         elif isiterable(args[0]):
             from_sequence(*args)
@@ -138,25 +162,137 @@ class blis(Integral, MutableSequence):
             raise TypeError(f'Expected first argument to be either '
                             f'int, list, tuple or blis, not {type(args[0])}.')
 
+    @classmethod
+    def _new(cls, value, nbits):
+        """Create directly from an unsigned value, without any checks."""
+        self = cls.__new__(cls)
+        self._value = value
+        self._nbits = nbits
+        return self
+
+    def _setint(self, val, nbits=None):
+        """Set the bits to the int val, as blis(val, nbits) does."""
+        neg = val < 0
+        val = abs(val)
+
+        if val == 0:
+            self._value = 0
+            self._nbits = nbits or 8
+            return self
+
+        m = floorpow2(val) + 2 # plus 2 because of zero indexing and one more for two's compl.
+        nbits = nbits or max(m, 8)
+        assert nbits > 0, 'nbits must be positive.'
+        self._nbits = nbits
+        self._value = val & self.mask
+        if neg:
+            self.negate()
+        return self
+
+    # prefix: (base, bits per digit), no prefix is binary
+    _prefixes = {'0b': (2, 1), '0o': (8, 3), '0x': (16, 4)}
+
+    def _setstring(self, string, nbits=None):
+        """
+        Set the bits to the digits of a binary, octal or hex string.
+
+        Octal and hex need a 0o or 0x prefix, binary may have 0b. '_' may
+        separate digits. nbits defaults to the bits of the digits, leading
+        zeros included, e.g. blis('0x00ff') has 16 bits.
+        """
+        base, width = self._prefixes.get(string[:2].lower(), (None, 1))
+        digits = string[2:] if base else string
+        if '_' in digits:
+            digits = digits.replace('_', '')
+        # int also takes signs and whitespace, those are not digits
+        if not digits.isalnum():
+            raise ValueError(f'Expected a string of digits, not {string!r}.')
+        value = int(digits, base or 2)
+        nbits = nbits or width * len(digits)
+        assert nbits > 0, 'nbits must be positive.'
+        self._nbits = nbits
+        self._value = value & self.mask
+        return self
+
+    @classmethod
+    def from_bytes(cls, buf, byteorder='big', *, signed=False, nbits=None):
+        """
+        Create from the bytes of any buffer (bytes, memoryview, mmap, ...).
+
+        nbits defaults to 8 bits per byte. A larger nbits is sign extended if
+        signed, else zero extended. A smaller nbits cuts the MSBs.
+
+        >> blis.from_bytes(b'\\x01\\x80')
+        blis('0000000110000000', 384)
+        >> blis.from_bytes(b'\\x80', signed=True, nbits=12)
+        blis('111110000000', -128)
+        """
+        with memoryview(buf) as mv:
+            nbits = nbits or 8 * mv.nbytes
+            value = int.from_bytes(mv, byteorder, signed=signed)
+        assert nbits > 0, 'nbits must be positive.'
+        return cls._new(value & ((1 << nbits) - 1), nbits)
+
+    def to_bytes(self, length=None, byteorder='big', *, signed=False):
+        """
+        Return the bits as bytes, length defaults to as few as possible.
+
+        Padding bytes are zeros, or copies of the MSB if signed.
+        """
+        if length is None:
+            length = -(-self._nbits // 8)
+        value = int(self) if signed else self._value
+        return value.to_bytes(length, byteorder, signed=signed)
+
+    def view(self):
+        """
+        Return a read-only memoryview of the bits packed into bytes.
+
+        The bytes are little endian, i.e. byte i holds the bits 8*i to 8*i+7.
+        With python 3.12+ memoryview(self) gives the same view.
+        """
+        return memoryview(self.to_bytes(byteorder='little')).toreadonly()
+
+    def __buffer__(self, flags):
+        return self.view()
+
     #
     # PROPERTY
     #
 
     @property
     def nbits(self):
-        return len(self.bits)
+        return self._nbits
 
     @nbits.setter
     def nbits(self, n):
-        if n > self.nbits:
-            while len(self.bits) < n:
-                self.bits.append(0)
-        else:
-            self.bits = self.bits[:n]
+        # larger n pads with zeros, smaller n cuts the MSBs
+        self._nbits = n
+        self._value &= self.mask
+
+    @property
+    def mask(self):
+        return (1 << self._nbits) - 1
+
+    @property
+    def bits(self):
+        """
+        The bits as a list of ints, index 0 -> LSB.
+
+        This is a copy, changing the list will not change self. Assign a new
+        list to replace all bits.
+        """
+        return [int(c) for c in reversed(self._bitstring())]
+
+    @bits.setter
+    def bits(self, bits):
+        bits = list(bits)
+        self._nbits = len(bits)
+        self._value = int(''.join('1' if b else '0' for b in reversed(bits)) or '0', 2)
 
     @property
     def isneg(self):
-        return bool(self.bits[-1]) if self.bits else True
+        return bool(self._value >> (self._nbits - 1)) if self._nbits else True
     
     #
     # MODIFIERS
@@ -170,19 +306,14 @@ class blis(Integral, MutableSequence):
         return self
 
     def invert(self):
-        for i, b in enumerate(self):
-            self.bits[i] = int(not b)
+        self._value ^= self.mask
         return self
 
     def increment(self):
-        i, carry = 0, 1
-        while carry and i < self.nbits:
-            self.bits[i] = (self.bits[i] + carry) % 2
-            if self.bits[i]:
-                carry = 0
-            i += 1
-        if carry:
-            self.bits.append(True)
+        self._value += 1
+        if self._value >> self._nbits:
+            # carry out of MSB, grow by one bit
+            self._nbits += 1
         return self
 
     #
@@ -193,87 +324,188 @@ class blis(Integral, MutableSequence):
         return f"blis('{self!s}', {int(self)})"
 
     def __int__(self):
-        value = sum(2**i for i, b in enumerate(self) if b)
-        if self.isneg:
-            value -= 2**self.nbits
+        # the value is kept as an int, only the sign needs fixing, as isneg
+        value = self._value
+        if not self._nbits or value >> (self._nbits - 1):
+            value -= 1 << self._nbits
         return value
 
+    __index__ = __int__
+
     def __iter__(self):
-        return iter(self.bits)
+        return map(int, reversed(self._bitstring()))
 
     def __str__(self):
-        return ''.join(str(val) for val in reversed(self.bits))
+        return self._bitstring()
+
+    def __format__(self, spec):
+        """
+        Format the bits as binary (b), octal (o) or hex (x, X) digits.
+
+        All nbits are shown, with leading zeros. '#' adds the prefix and '_'
+        separates every 4 digits. Other specs format int(self).
+
+        >> format(blis(-2, 20), '#_x')
+        '0xf_fffe'
+        """
+        if not spec:
+            return str(self)
+        base = spec[-1]
+        if base not in ('b', 'o', 'x', 'X') or spec[:-1].strip('#_'):
+            return format(int(self), spec)
+        ndigits = -(-self._nbits // {'b': 1, 'o': 3}.get(base, 4))
+        digits = format(self._value, f'0{ndigits}{base}')
+        if '_' in spec:
+            # groups of 4 from the LSB, as for int
+            head = len(digits) % 4 or 4
+            digits = '_'.join([digits[:head]] + [digits[i:i + 4]
+                              for i in range(head, len(digits), 4)])
+        if '#' in spec:
+            digits = '0' + base + digits
+        return digits
+
+    def _bitstring(self):
+        return format(self._value, f'0{self._nbits}b') if self._nbits else ''
+
+    #
+    # BIT SCAN
+    #
+
+    def popcount(self):
+        """Return the number of high bits."""
+        return self._value.bit_count()
+
+    def parity(self):
+        """Return 1 if there is an odd number of high bits, else 0."""
+        return self._value.bit_count() & 1
+
+    def clz(self):
+        """Return the number of low bits above the highest high bit."""
+        return self._nbits - self._value.bit_length()
+
+    def ctz(self):
+        """Return the number of low bits below the lowest high bit."""
+        return self.ffs() if self._value else self._nbits
+
+    def ffs(self):
+        """Return the index of the lowest high bit, -1 if there is none."""
+        return (self._value & -self._value).bit_length() - 1
+
+    def fls(self):
+        """Return the index of the highest high bit, -1 if there is none."""
+        return self._value.bit_length() - 1
+
+    def iterhigh(self):
+        """Iterate over the indices of the high bits, from LSB."""
+        return _iterhigh(self._value)
 
     #
     # MATH OPERATORS
     #
 
+    # The arithmetic is done on ints. The result has the nbits of the widest
+    # operand, more if the value does not fit, ints count with the nbits
+    # blis(int) would have.
+
+    @staticmethod
+    def _operand(other):
+        """Return the int and nbits of other, without making a blis."""
+        if isinstance(other, blis):
+            return int(other), other._nbits
+        if isinstance(other, Integral):
+            other = int(other)
+            return other, max(abs(other).bit_length() + 1, 8)
+        other = blis(other)
+        return int(other), other._nbits
+
+    @staticmethod
+    def _fromint(val, nbits):
+        """Return a blis of the int val, with nbits or as many as it needs."""
+        if (val if val >= 0 else ~val).bit_length() >= nbits:
+            nbits = max(abs(val).bit_length() + 1, 8)
+        return blis._new(val & ((1 << nbits) - 1), nbits)
+
     ## Unary
 
     def __pos__(self):
         # nothing more than copy self
-        return blis(self)
+        return self.copy()
     
     def __neg__(self):
-        # copy and negate
-        return blis(self).negate()
+        return blis._fromint(-int(self), self._nbits)
 
     ## Binary
 
-    @makeargblis
     def __add__(self, other):
-        nbits = max(self.nbits, other.nbits)
-        val = int(self) + int(other) # easier to add in integers
-        if 2**(nbits - 1) < val:
-            nbits = None
-        return blis(val, nbits)
+        val, nbits = self._operand(other)
+        return blis._fromint(int(self) + val, max(self._nbits, nbits))
     
     def __radd__(self, other):
         return self + other
 
-    @makeargblis
+    def __iadd__(self, other):
+        # arithmetic as +, not extend as for other mutable sequences
+        result = self + other
+        self._value, self._nbits = result._value, result._nbits
+        return self
+
+    def __sub__(self, other):
+        val, nbits = self._operand(other)
+        return blis._fromint(int(self) - val, max(self._nbits, nbits))
+
+    def __rsub__(self, other):
+        val, nbits = self._operand(other)
+        return blis._fromint(val - int(self), max(self._nbits, nbits))
+
     def __mul__(self, other):
-        val = int(self) * int(other) # easier in integers
-        return blis(val)
+        val, nbits = self._operand(other)
+        return blis._fromint(int(self) * val, max(self._nbits, nbits))
 
     def __rmul__(self, other):
         return self * other
 
     def __truediv__(self, other):
-        return self / other
+        return int(self) / self._operand(other)[0]
 
     def __rtruediv__(self, other):
-        return other / self
+        return self._operand(other)[0] / int(self)
 
-    @makeargblis
     def __floordiv__(self, other):
-        val = int(self) // int(other) # easier in integers
-        return blis(val)
+        val, nbits = self._operand(other)
+        return blis._fromint(int(self) // val, max(self._nbits, nbits))
     
-    @makeargblis
     def __rfloordiv__(self, other):
-        val = int(other) // int(self)
-        return blis(val)
+        val, nbits = self._operand(other)
+        return blis._fromint(val // int(self), max(self._nbits, nbits))
 
     ## Special
 
-    @makeargblis
-    def __pow__(self, other):
-        val = int(self) ** int(other) # easier in integers
-        return blis(val)
+    def __pow__(self, other, mod=None):
+        """
+        self ** other, or pow(self, other, mod).
 
-    def __rpow__(self, arg):
-        return NotImplemented
+        A negative exponent gives a float, as for int, unless mod is given.
+        pow(self, other, mod) has the nbits of mod.
+        """
+        val, nbits = self._operand(other)
+        if mod is not None:
+            mod, nbits = self._operand(mod)
+            return blis._fromint(pow(int(self), val, mod), nbits)
+        if val < 0:
+            return int(self) ** val
+        return blis._fromint(int(self) ** val, max(self._nbits, nbits))
+
+    def __rpow__(self, other, mod=None):
+        val, nbits = self._operand(other)
+        return blis._new(val & ((1 << nbits) - 1), nbits).__pow__(self, mod)
 
-    @makeargblis
     def __mod__(self, other):
-        val = int(self) % int(other) # easier in integers
-        return blis(val, other.nbits)
+        val, nbits = self._operand(other)
+        return blis._fromint(int(self) % val, nbits)
 
-    @makeargblis
     def __rmod__(self, other):
-        val = int(other) % int(self)
-        return blis(val, self.nbits)
+        val, _ = self._operand(other)
+        return blis._fromint(val % int(self), self._nbits)
 
     ## Functions
 
@@ -290,19 +522,13 @@ class blis(Integral, MutableSequence):
         that is, move towards positive infinity.
         """
         if self.isneg:
-            i = self.nbits - 1
-            while self.bits[i] == 1:
-                i -= 1
-            other = blis(0, self.nbits)
-            other.bits[i:] = [1] * (self.nbits - i)
+            i = (self._value ^ self.mask).bit_length() - 1 # MSB that is 0
+            value = self.mask ^ ((1 << i) - 1)
         else:
-            i = self.nbits - 1
-            while self.bits[i] == 0:
-                i -= 1
-            other = blis(0, self.nbits)
-            other.bits[i+1] = 1
+            i = self._value.bit_length() - 1 # MSB that is 1
+            value = 1 << (i + 1)
         
-        return other
+        return blis._new(value & self.mask, self.nbits)
 
     def __floor__(self):
         """
@@ -312,20 +538,13 @@ class blis(Integral, MutableSequence):
         same as ceil, but move towards negative infinity.
         """
         if self.isneg:
-            i = self.nbits - 1
-            while self.bits[i] == 1:
-                i -= 1
-            i += 1
-            other = blis(0, self.nbits)
-            other.bits[i:] = [1] * (self.nbits - i)
+            i = (self._value ^ self.mask).bit_length() # one above MSB that is 0
+            value = self.mask ^ ((1 << i) - 1)
         else:
-            i = self.nbits - 1
-            while self.bits[i] == 0:
-                i -= 1
-            other = blis(0, self.nbits)
-            other.bits[i] = 1
+            i = self._value.bit_length() - 1 # MSB that is 1
+            value = 1 << i
         
-        return other
+        return blis._new(value & self.mask, self.nbits)
 
     def __trunc__(self):
         return self.__ceil__() if self.isneg else self.__floor__()
@@ -340,10 +559,7 @@ class blis(Integral, MutableSequence):
         >> round(x, 3)
         [11111000]
         """
-        val = blis(self)
-        for i in range(n):
-            val.bits[i] = 0
-        return val
+        return blis._new(self._value & ~((1 << n) - 1), self.nbits)
 
     #
     # BIT OPERATORS
@@ -353,17 +569,15 @@ class blis(Integral, MutableSequence):
 
     def __invert__(self):
         # copy and invert
-        return blis(self).invert()
+        return self.copy().invert()
 
     ## Binary
 
     @makeargblis
     def __and__(self, other):
         nbits = max(self.nbits, other.nbits)
-        val = blis(self, nbits) # copy
-        for i, bit in enumerate(other):
-            val.bits[i] &= bit
-        return val
+        # only the bits of other are applied, the rest of self is kept
+        return blis._new(self._value & (other._value | ~other.mask), nbits)
     
     def __rand__(self, other):
         return self & other
@@ -371,10 +585,7 @@ class blis(Integral, MutableSequence):
     @makeargblis
     def __or__(self, other):
         nbits = max(self.nbits, other.nbits)
-        val = blis(self, nbits) # copy
-        for i, bit in enumerate(other):
-            val.bits[i] |= bit
-        return val
+        return blis._new(self._value | other._value, nbits)
 
     def __ror__(self, other):
         return self | other
@@ -382,14 +593,31 @@ class blis(Integral, MutableSequence):
     @makeargblis
     def __xor__(self, other):
         nbits = max(self.nbits, other.nbits)
-        val = blis(self, nbits)
-        for i, bit in enumerate(other):
-            val.bits[i] ^= bit
-        return val
+        return blis._new(self._value ^ other._value, nbits)
     
     def __rxor__(self, other):
         return self ^ other
 
+    ## In-place, same as above without a new blis
+
+    @makeargblis
+    def __iand__(self, other):
+        self._value &= other._value | ~other.mask
+        self._nbits = max(self._nbits, other._nbits)
+        return self
+
+    @makeargblis
+    def __ior__(self, other):
+        self._value |= other._value
+        self._nbits = max(self._nbits, other._nbits)
+        return self
+
+    @makeargblis
+    def __ixor__(self, other):
+        self._value ^= other._value
+        self._nbits = max(self._nbits, other._nbits)
+        return self
+
     ## Special
 
     """
@@ -407,31 +635,26 @@ class blis(Integral, MutableSequence):
 
     def __lshift__(self, other):
         if type(other) is int:
-            retval = blis()
-            retval.bits = [0] * other + self.bits
-            retval.nbits = self.nbits
+            value = self._value << max(other, 0)
         else:
             # self << other
             other = blis(other)
-            
-            retval = blis()
-            retval.bits = other.bits + self.bits
-            retval.bits = retval.bits[:self.nbits]
+            value = self._value << other.nbits | other._value
 
-        return retval
+        return blis._new(value & self.mask, self.nbits)
 
     def __rlshift__(self, other):
         if type(other) is int:
             if other > self.nbits:
                 raise TypeError('Argument cannot be larger than nbits.')
-            retval = blis(self.bits[-other:])
+            if other == 0:
+                return self.copy()
+            retval = blisview(self, self.nbits - other)
         else:
             # other << self
             other = blis(other)
-            
-            retval = blis()
-            retval.bits = self.bits + other.bits
-            retval.bits = retval.bits[:other.nbits]
+            value = other._value << self.nbits | self._value
+            retval = blis._new(value & other.mask, other.nbits)
 
         return retval
 
@@ -439,66 +662,318 @@ class blis(Integral, MutableSequence):
         if type(other) is int:
             if other > self.nbits:
                 raise TypeError('Argument cannot be larger than nbits.')
-            retval = blis(self.bits[:other])
+            if other <= 0:
+                retval = blis(self.bits[:other])
+            else:
+                retval = blisview(self, 0, other)
         else:
             # self >> other
             other = blis(other)
-
-            retval = blis()
-            retval.bits = other.bits + self.bits
-            retval.bits = retval.bits[-other.nbits:]
+            value = self._value << other.nbits | other._value
+            retval = blis._new(value >> self.nbits, other.nbits)
         
         return retval
 
+    def __ilshift__(self, other):
+        if type(other) is int:
+            self._value = self._value << max(other, 0) & self.mask
+        else:
+            other = other if isinstance(other, blis) else blis(other)
+            self._value = (self._value << other._nbits | other._value) & self.mask
+        return self
+
+    def __irshift__(self, other):
+        if type(other) is int and 0 < other <= self._nbits:
+            self._value &= (1 << other) - 1
+            self._nbits = other
+            return self
+        result = self >> other
+        self._value, self._nbits = result._value, result._nbits
+        return self
+
     def __rrshift__(self, other):
         if type(other) is int:
-            retval = blis()
-            retval.bits = self.bits + [0] * other
-            retval.bits = retval.bits[-self.nbits:]
+            value = self._value >> max(other, 0)
         else:
             # other >> self
             other = blis(other)
+            value = (other._value << self.nbits | self._value) >> other.nbits
 
-            retval = blis()
-            retval.bits = self.bits + other.bits
-            retval.bits = retval.bits[-self.nbits:]
-
-        return retval        
+        return blis._new(value, self.nbits)
 
     #
     # COMPARISON
     #
 
-    @makeargblis
+    # ints are compared as they are, without wrapping them in a blis
+
     def __eq__(self, other):
-        return int(self) == int(other)
+        if not isinstance(other, int):
+            other = int(other if isinstance(other, blis) else blis(other))
+        return int(self) == other
 
-    @makeargblis
     def __le__(self, other):
-        return int(self) <= int(other)
+        if not isinstance(other, int):
+            other = int(other if isinstance(other, blis) else blis(other))
+        return int(self) <= other
 
-    @makeargblis
     def __lt__(self, other):
-        return int(self) < int(other)
+        if not isinstance(other, int):
+            other = int(other if isinstance(other, blis) else blis(other))
+        return int(self) < other
+
+    def __ge__(self, other):
+        if not isinstance(other, int):
+            other = int(other if isinstance(other, blis) else blis(other))
+        return int(self) >= other
+
+    def __gt__(self, other):
+        if not isinstance(other, int):
+            other = int(other if isinstance(other, blis) else blis(other))
+        return int(self) > other
 
     #
     # MANAGEMENT
     #
 
-    def __len__(self, *args, **kwargs):
-        return self.bits.__len__(*args, **kwargs)
+    def __len__(self):
+        return self._nbits
+
+    def copy(self):
+        """Return a copy, without validating the bits again."""
+        return blis._new(self._value, self._nbits)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def _index(self, i):
+        if not -self._nbits <= i < self._nbits:
+            raise IndexError('blis index out of range')
+        return i % self._nbits
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._nbits)
+            if step != 1 or stop <= start:
+                return blis(self.bits[i])
+            return blisview(self, start, stop)
+        return blis(self._value >> self._index(i) & 1)
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._nbits)
+            width = stop - start
+            if not isinstance(value, blis):
+                value = list(value)
+            if step == 1 and width > 0 and len(value) == width:
+                value = blis(value, width)
+                mask = ((1 << width) - 1) << start
+                self._value = self._value & ~mask | value._value << start
+            else:
+                # may change the length, let list handle it
+                bits = self.bits
+                bits[i] = value
+                self.bits = bits
+            return
+        i = self._index(i)
+        if value:
+            self._value |= 1 << i
+        else:
+            self._value &= ~(1 << i)
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            bits = self.bits
+            del bits[i]
+            self.bits = bits
+            return
+        i = self._index(i)
+        low = self._value & ((1 << i) - 1)
+        self._value = self._value >> (i + 1) << i | low
+        self._nbits -= 1
+
+    def insert(self, i, value):
+        # same index semantics as list.insert
+        i = min(max(i + self._nbits if i < 0 else i, 0), self._nbits)
+        low = self._value & ((1 << i) - 1)
+        high = self._value >> i << (i + 1)
+        self._value = high | bool(value) << i | low
+        self._nbits += 1
+
+
+class frozenblis(blis):
+    """
+    An immutable and hashable blis, e.g. for dict keys and set members.
+
+    Two frozenblis are equal if they have the same bits and nbits, the hash
+    covers both. As the width is part of the key, a frozenblis is never
+    equal to an int or a plain blis, compare int(x) for the value. Operators
+    give a new (mutable) blis, in-place operators rebind.
+
+    >> ops = {frozenblis('0110'): 'load', frozenblis('00110'): 'store'}
+
+    frozenblis.intern gives one shared object per bit pattern.
+    """
+
+    __slots__ = ('_hash',)
+
+    _interned = {}
+
+    def __init__(self, *args):
+        x = args[0] if len(args) == 1 and isinstance(args[0], blis) else blis(*args)
+        self._value = x._value
+        self._nbits = x._nbits
+        self._hash = hash((self._value, self._nbits))
+
+    @classmethod
+    def _new(cls, value, nbits):
+        self = cls.__new__(cls)
+        self._value = value
+        self._nbits = nbits
+        self._hash = hash((value, nbits))
+        return self
+
+    @classmethod
+    def intern(cls, *args):
+        """Return the shared frozenblis of the bits, made on first use."""
+        x = args[0] if len(args) == 1 and type(args[0]) is cls else cls(*args)
+        return cls._interned.setdefault((x._value, x._nbits), x)
+
+    @classmethod
+    def clearinterned(cls):
+        cls._interned.clear()
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        # equal objects must hash equal, so no value-only equality with ints
+        if isinstance(other, frozenblis):
+            return self._value == other._value and self._nbits == other._nbits
+        return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return f"frozenblis('{self!s}', {int(self)})"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _immutable(self, *args):
+        raise TypeError(f"'{type(self).__name__}' object is immutable")
+
+    __setitem__ = __delitem__ = insert = _immutable
+    negate = invert = increment = _setint = _immutable
+
+    nbits = property(blis.nbits.fget)
+    bits = property(blis.bits.fget, doc=blis.bits.__doc__)
+
+    __iand__, __ior__, __ixor__ = blis.__and__, blis.__or__, blis.__xor__
+    __iadd__ = blis.__add__
+    __ilshift__, __irshift__ = blis.__lshift__, blis.__rshift__
+
+
+class blisview(blis):
+    """
+    The bits start to stop of a blis, made without copying them.
+
+    The view keeps the int of the blis it is made from. Ints are immutable,
+    so later changes of that blis do not show in the view, same as for a
+    copy. The bits are cut out on first use of the whole value, a single
+    bit or a slice of a view does not need that, slices of views are views.
+    Changing a view only changes the view.
+
+    blis slices, x[i:j], and x >> n, n << x for int n are views.
+
+    >> frame = blis.from_bytes(packet)
+    >> header = frame[-32:]     # O(1)
+    >> header[:8]               # O(1), a view of the same int
+    """
+
+    __slots__ = ('_base', '_start')
+
+    _slot = blis._value # the storage of blis
+
+    def __init__(self, x, start=0, stop=None):
+        start, stop, _ = slice(start, stop).indices(len(x))
+        assert stop > start, 'A view must have at least one bit.'
+        if isinstance(x, blisview) and x._base is not None:
+            self._base, self._start = x._base, x._start + start
+        else:
+            self._base, self._start = x._value, start
+        self._nbits = stop - start
+
+    @property
+    def _value(self):
+        if self._base is None:
+            return blisview._slot.__get__(self)
+        value = self._base >> self._start & ((1 << self._nbits) - 1)
+        self._value = value # cut out once
+        return value
+
+    @_value.setter
+    def _value(self, value):
+        blisview._slot.__set__(self, value)
+        self._base = None
+
+    @property
+    def nbits(self):
+        return self._nbits
+
+    @nbits.setter
+    def nbits(self, n):
+        # cut out the bits before the width changes
+        self._value = self._value
+        blis.nbits.fset(self, n)
 
     def __getitem__(self, i):
-        return blis(self.bits[i])
+        if self._base is None or isinstance(i, slice):
+            return blis.__getitem__(self, i)
+        return blis(self._base >> (self._start + self._index(i)) & 1)
+
+    def __reduce__(self):
+        return blis._new, (self._value, self._nbits)
+
+
+def _iterhigh(x):
+    # x & -x isolates the lowest high bit
+    while x:
+        low = x & -x
+        yield low.bit_length() - 1
+        x ^= low
+
+
+class bitmask:
+    """
+    A compiled index list for BinT, see BinT.mask.
+
+    mask: All bits il are high.
+    n_mask: mask ^ g_mask, all other valid bits are high.
+    flip: Bits il that appear an odd number of times in il are high.
+    """
+
+    __slots__ = ('nbit', 'il', 'mask', 'n_mask', 'flip')
 
-    def __setitem__(self, *args, **kwargs):
-        self.bits.__setitem__(*args, **kwargs)
+    def __init__(self, nbit, il):
+        self.nbit = nbit
+        self.il = il
+        self.mask = self.flip = 0
+        for i in il:
+            self.mask |= 1 << i
+            self.flip ^= 1 << i
+        self.n_mask = self.mask ^ ((1 << nbit) - 1)
 
-    def __delitem__(self, *args, **kwargs):
-        self.bits.__delitem__(*args, **kwargs)
+    def __repr__(self):
+        return f'bitmask({self.nbit}, {self.il})'
 
-    def insert(self, *args, **kwargs):
-        self.bits.insert(*args, **kwargs)
+_cachedmask = lru_cache(maxsize=1024)(bitmask)
 
 
 class BinT:
@@ -559,6 +1034,13 @@ class BinT:
 
         If no indices are applied the operation is done one all bits.
 
+        The masks of an index list are compiled once and cached (LRU) on
+        (nbit, il), see BinT.cacheinfo. A compiled mask from BinT.mask(*il)
+        can also be passed in place of the index list,
+
+            m = bin32.mask(1, 3, 4, 5)
+            bin32.moveAt(a, b, m)
+
         The method for keeping values unsigned is,
             - value: may be any number (1 << x) where x in range(self.nbit)
             - ADD self.senior -> Since it is always true senior > x, the
@@ -571,16 +1053,35 @@ class BinT:
         self.g_mask = self.senior - 1
         self.asuperior = asup
 
+    def mask(self, *il):
+        """Compile the index list il to a bitmask."""
+        return _cachedmask(self.nbit, il)
+
+    def _compile(self, il):
+        if type(il) is bitmask:
+            m = il
+        elif len(il) == 1 and type(il[0]) is bitmask:
+            m = il[0]
+        else:
+            return _cachedmask(self.nbit, tuple(il))
+        return m if m.nbit == self.nbit else _cachedmask(self.nbit, m.il)
+
+    @staticmethod
+    def cacheinfo():
+        """Return hits, misses, maxsize and currsize of the mask cache."""
+        return _cachedmask.cache_info()
+
+    @staticmethod
+    def resizecache(maxsize):
+        """Replace the mask cache with an empty one of maxsize masks."""
+        global _cachedmask
+        _cachedmask = lru_cache(maxsize=maxsize)(bitmask)
+
     def notAt(self, a, *il):
         """Bitwise operation NOT on bits il."""
         if not il:
             return ~a + self.senior & self.g_mask
-        for i in il:
-            mask = 1 << i
-            n_mask = mask ^ self.g_mask
-            # Use truthy/falsey property of bools
-            a = (a & n_mask) if a & mask else (a | mask)
-        return a
+        return (a ^ self._compile(il).flip) & self.g_mask
 
     def andAt(self, a, b, *il):
         """Bitwise operation AND on bits il."""
@@ -628,17 +1129,13 @@ class BinT:
         """Bitwise operation HIGH on bits il."""
         if not il:
             return self.g_mask
-        for i in il:
-            a |= 1 << i
-        return a
+        return a | self._compile(il).mask
 
     def lowAt(self, a, *il):
         """Bitwise operation LOW on bits il."""
         if not il:
             return 0
-        for i in il:
-            a &= (1 << i) ^ self.g_mask
-        return a
+        return a & self._compile(il).n_mask
 
     def moveAt(self, a, b, *il):
         """
@@ -653,67 +1150,1924 @@ class BinT:
         """
         if not il:
             return a
-        mask = 0
-        for i in il:
-            mask |= 1 << i
-        n_mask = mask ^ self.g_mask
-        return (a & n_mask) | (b & mask)
+        m = self._compile(il)
+        return (a & m.n_mask) | (b & m.mask)
 
     def represent(self, a):
         """return a tuple of bools representative of value."""
-        return tuple(bool(a & 1 << i) for i in range(self.nbit))
+        return tuple(c == '1' for c in reversed(format(a & self.g_mask, f'0{self.nbit}b')))
 
     def getWhereHigh(self, a):
         """Return a tuple of indices of all bits that are high."""
-        return tuple(i for i in range(self.nbit) if a & 1 << i)
+        return tuple(_iterhigh(a & self.g_mask))
 
     def getWhereLow(self, a):
         """Return a tuple of indices of all bits that are low."""
-        return tuple(i for i in range(self.nbit) if not a & 1 << i)
+        return tuple(_iterhigh(~a & self.g_mask))
+
+    def iterWhereHigh(self, a):
+        """Iterate over the indices of all bits that are high."""
+        return _iterhigh(a & self.g_mask)
         
     def isHighAt(self, a, *il):
         """Returns true if all indices in il are high."""
-        return all(a & 1 << i for i in il)
+        mask = self._compile(il).mask
+        return a & mask == mask
 
     def isLowAt(self, a, il):
         """Returns true if all indices in il are low."""
-        return not any(a & 1 << i for i in il)
+        return not a & self._compile(il).mask
 
     def haseven(self, a):
         """Returns true if there is a even amount of 1s in a."""
-        return sum(self.getWhereHigh(a)) % 2 == 0
+        return not self.parity(a)
 
+    def popcount(self, a):
+        """Return the number of high bits."""
+        return (a & self.g_mask).bit_count()
 
-class CRC:
-    
-    def __init__(self, poly):
-        self.poly = blis(poly)
-        self.order = self.poly.nbits
-        self.poly.append(1)
+    def parity(self, a):
+        """Return 1 if there is an odd number of high bits, else 0."""
+        return (a & self.g_mask).bit_count() & 1
 
-    def write(self, x):
+    def clz(self, a):
+        """Return the number of low bits above the highest high bit."""
+        return self.nbit - (a & self.g_mask).bit_length()
 
-        x = blis(x)
+    def ctz(self, a):
+        """Return the number of low bits below the lowest high bit."""
+        a &= self.g_mask
+        return (a & -a).bit_length() - 1 if a else self.nbit
 
-        if x.nbits < self.poly.nbits:
-            raise TypeError('x cannot have less number of bits than poly.')
+    def ffs(self, a):
+        """Return the index of the lowest high bit, -1 if there is none."""
+        a &= self.g_mask
+        return (a & -a).bit_length() - 1
+
+    def fls(self, a):
+        """Return the index of the highest high bit, -1 if there is none."""
+        return (a & self.g_mask).bit_length() - 1
+
+    #
+    # BATCH
+    #
+
+    # The *Many methods do the same as their counterparts but on whole numpy
+    # arrays of unsigned ints (uint8/16/32/64) at once. The arrays keep their
+    # dtype, b may also be a scalar. If nbit is larger than the dtype only the
+    # bits of the dtype are used.
+
+    def _asarrays(self, a, *bs):
+        if np is None:
+            raise ImportError('The batch operations requires numpy.')
+        a = np.asarray(a)
+        if a.dtype.kind != 'u':
+            raise TypeError(f'Expected an array of unsigned ints, not {a.dtype}.')
+        return (a, *(np.asarray(b, dtype=a.dtype) for b in bs))
+
+    def _cast(self, mask, a):
+        """Return mask as a scalar of the same dtype as a."""
+        return a.dtype.type(mask & np.iinfo(a.dtype).max)
+
+    def _binaryAtMany(self, op, a, b, il):
+        a, b = self._asarrays(a, b)
+        g_mask = self._cast(self.g_mask, a)
+        if not il:
+            return op(a, b) & g_mask
+        m = self._compile(il)
+        mask = self._cast(m.mask, a)
+        c = a & self._cast(m.n_mask, a) if self.asuperior else 0
+        return c | (op(a, b) & mask)
+
+    def notAtMany(self, a, *il):
+        """Bitwise operation NOT on bits il, for arrays."""
+        a, = self._asarrays(a)
+        g_mask = self._cast(self.g_mask, a)
+        if not il:
+            return ~a & g_mask
+        return (a ^ self._cast(self._compile(il).flip, a)) & g_mask
+
+    def andAtMany(self, a, b, *il):
+        """Bitwise operation AND on bits il, for arrays."""
+        return self._binaryAtMany(lambda a, b: a & b, a, b, il)
+
+    def nandAtMany(self, a, b, *il):
+        """Bitwise operation NAND on bits il, for arrays."""
+        return self._binaryAtMany(lambda a, b: ~(a & b), a, b, il)
+
+    def orAtMany(self, a, b, *il):
+        """Bitwise operation OR on bits il, for arrays."""
+        return self._binaryAtMany(lambda a, b: a | b, a, b, il)
+
+    def norAtMany(self, a, b, *il):
+        """Bitwise operation NOR on bits il, for arrays."""
+        return self._binaryAtMany(lambda a, b: ~(a | b), a, b, il)
+
+    def xorAtMany(self, a, b, *il):
+        """Bitwise operation XOR on bits il, for arrays."""
+        return self._binaryAtMany(lambda a, b: a ^ b, a, b, il)
+
+    def xnorAtMany(self, a, b, *il):
+        """Bitwise operation XNOR on bits il, for arrays."""
+        return self._binaryAtMany(lambda a, b: ~(a ^ b), a, b, il)
+
+    def highAtMany(self, a, *il):
+        """Bitwise operation HIGH on bits il, for arrays."""
+        a, = self._asarrays(a)
+        if not il:
+            return np.full_like(a, self._cast(self.g_mask, a))
+        return a | self._cast(self._compile(il).mask, a)
+
+    def lowAtMany(self, a, *il):
+        """Bitwise operation LOW on bits il, for arrays."""
+        a, = self._asarrays(a)
+        if not il:
+            return np.zeros_like(a)
+        return a & self._cast(self._compile(il).n_mask, a)
+
+    def moveAtMany(self, a, b, *il):
+        """Move bits il from b to a, for arrays."""
+        a, b = self._asarrays(a, b)
+        if not il:
+            return a.copy()
+        m = self._compile(il)
+        return (a & self._cast(m.n_mask, a)) | (b & self._cast(m.mask, a))
+
+    def isHighAtMany(self, a, *il):
+        """Returns a bool array, true where all indices in il are high."""
+        a, = self._asarrays(a)
+        mask = self._cast(self._compile(il).mask, a)
+        return a & mask == mask
+
+    def isLowAtMany(self, a, il):
+        """Returns a bool array, true where all indices in il are low."""
+        a, = self._asarrays(a)
+        return a & self._cast(self._compile(il).mask, a) == 0
+
+    # The counts are returned as arrays of np.intp.
+
+    def popcountMany(self, a):
+        """Return the number of high bits, for arrays."""
+        a, = self._asarrays(a)
+        return _popcountMany(a & self._cast(self.g_mask, a))
+
+    def parityMany(self, a):
+        """Return the parity of the high bits, for arrays."""
+        return self.popcountMany(a) & 1
+
+    def hasevenMany(self, a):
+        """Returns a bool array, true where there is an even amount of 1s."""
+        return self.parityMany(a) == 0
+
+    def clzMany(self, a):
+        """Return the number of low bits above the highest high bit, for arrays."""
+        a, = self._asarrays(a)
+        nbit = min(self.nbit, a.itemsize * 8)
+        return nbit - _bitlengthMany(a & self._cast(self.g_mask, a))
+
+    def ctzMany(self, a):
+        """Return the number of low bits below the lowest high bit, for arrays."""
+        a, = self._asarrays(a)
+        nbit = min(self.nbit, a.itemsize * 8)
+        a = a & self._cast(self.g_mask, a)
+        # (a & -a) - 1 has the trailing zeros high
+        low = a & (~a + a.dtype.type(1))
+        return np.where(a == 0, nbit, _popcountMany(low - a.dtype.type(1)))
+
+    def ffsMany(self, a):
+        """Return the index of the lowest high bit, -1 if none, for arrays."""
+        a, = self._asarrays(a)
+        return np.where(a & self._cast(self.g_mask, a) == 0, -1, self.ctzMany(a))
+
+    def flsMany(self, a):
+        """Return the index of the highest high bit, -1 if none, for arrays."""
+        a, = self._asarrays(a)
+        return _bitlengthMany(a & self._cast(self.g_mask, a)) - 1
+
+
+#
+# BITARRAY
+#
+
+class bitarray:
+    """
+    A packed array of bits, for bitmaps with many bits.
+
+    Bit i is bit i % 8 of byte i // 8 (little endian), as blis.view. The
+    bytes are kept in a bytearray padded to whole 64-bit words. The padding
+    bits are not part of the bitmap, they are masked off when read and kept
+    as they are when written. With numpy the bulk operations work on the
+    words, otherwise on the whole bitmap as one int.
+
+    >> b = bitarray(10**7)
+    >> b.fill(0, 1000)
+    >> b.set(1001)
+    >> b.find_first_zero(), b.popcount()
+    (1000, 1001)
+
+    The words (numpy) or the int can be handed to BinT, the bits past nbits
+    in the last word are ignored,
+
+    >> b.words()[:] = BinT(64).lowAtMany(b.words(), 0, 63)
+
+    bitarray.open maps a file instead, only the pages touched are read and
+    changes are written back to the file, see flush.
+
+    >> with bitarray.open('alloc.map') as b:
+    >>     b[4096:4160] = blis(-1, 64)
+    """
+
+    chunksize = 1 << 20 # bytes scanned at a time by the find methods
+
+    def __init__(self, nbits, value=0):
+        if nbits < 0:
+            raise ValueError(f'Expected nbits to be non-negative, not {nbits}.')
+        self._nbits = nbits
+        self._buf = bytearray(-(-nbits // 64) * 8)
+        if value:
+            self.fill(0, nbits)
+
+    @classmethod
+    def open(cls, path, nbits=None, readonly=False):
+        """
+        Map the file at path as a bitarray.
+
+        nbits defaults to 8 bits per byte of the file. Unless readonly, the
+        file is created if missing and grown with zeros to whole 64-bit words.
+        The bytes of the file are left as they are, also the bits past nbits.
+        """
+        fd = os.open(path, os.O_RDONLY if readonly else os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            size = os.fstat(fd).st_size
+            nbits = 8 * size if nbits is None else nbits
+            nbytes = -(-nbits // 64) * 8
+            if size < nbytes:
+                if readonly:
+                    raise ValueError(f'Expected a file of at least {nbytes} bytes '
+                                     f'for {nbits} bits, not {size}.')
+                os.ftruncate(fd, nbytes)
+            access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+            buf = mmap.mmap(fd, nbytes, access=access) if nbytes else bytearray()
+        finally:
+            os.close(fd)
+        self = cls(0)
+        self._nbits = nbits
+        self._buf = buf
+        return self
+
+    def flush(self):
+        """Write changes back to the file, if mapped."""
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.flush()
+
+    def close(self):
+        """Flush and unmap the file, if mapped."""
+        if isinstance(self._buf, mmap.mmap) and not self._buf.closed:
+            self._buf.flush()
+            self._buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _tail(self):
+        """The mask of the bits of the last word which are not padding."""
+        return (1 << (self._nbits % 64 or 64)) - 1
+
+    @classmethod
+    def from_int(cls, value, nbits):
+        """Create from the nbits first bits of an unsigned int."""
+        self = cls(nbits)
+        self._setint(value)
+        return self
+
+    @classmethod
+    def from_blis(cls, x):
+        return cls.from_int(x._value, x._nbits)
+
+    def to_blis(self):
+        return blis._new(int(self), self._nbits)
+
+    def __int__(self):
+        return int.from_bytes(self._buf, 'little') & ((1 << self._nbits) - 1)
+
+    def _setint(self, value):
+        self._setrange(0, self._nbits, value & ((1 << self._nbits) - 1))
+
+    def words(self):
+        """Return the bits as a numpy array of uint64, sharing memory."""
+        if np is None:
+            raise ImportError('bitarray.words requires numpy.')
+        return np.frombuffer(self._buf, dtype='<u8')
+
+    def copy(self):
+        other = bitarray(0)
+        other._nbits = self._nbits
+        other._buf = bytearray(self._buf)
+        return other
+
+    def __len__(self):
+        return self._nbits
+
+    def __repr__(self):
+        return f'bitarray({self._nbits})'
+
+    def __eq__(self, other):
+        if not isinstance(other, bitarray):
+            return NotImplemented
+        if self._nbits != other._nbits:
+            return False
+        if not self._nbits:
+            return True
+        a, b, n = memoryview(self._buf), memoryview(other._buf), len(self._buf) - 8
+        tail = self._tail()
+        return a[:n] == b[:n] and int.from_bytes(a[n:], 'little') & tail \
+            == int.from_bytes(b[n:], 'little') & tail
+
+    #
+    # SINGLE BITS
+    #
 
-        # padding with order
-        x.bits = [0] * self.order + x.bits
+    def _index(self, i):
+        if not -self._nbits <= i < self._nbits:
+            raise IndexError('bitarray index out of range')
+        return i % self._nbits
 
-        i = 0
-        while x[self.order + 1:]:
-            if x[-(i+1)] == 0:
-                i += 1
-                continue
-            
-            print(x)
-            print(' '*i + str(self.poly))
-            
-            sl = slice(-(self.poly.nbits + i), -i or None)
-            x[sl] = x[sl] ^ self.poly
+    def test(self, i):
+        i = self._index(i)
+        return bool(self._buf[i >> 3] >> (i & 7) & 1)
 
-        print(x)
-        return x[:self.order]
+    def set(self, i):
+        i = self._index(i)
+        self._buf[i >> 3] |= 1 << (i & 7)
 
+    def clear(self, i):
+        i = self._index(i)
+        self._buf[i >> 3] &= ~(1 << (i & 7)) & 0xFF
 
+    # as for blis, a slice gives a blis
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._nbits)
+            if step != 1 or stop <= start:
+                return blis([int(self.test(j)) for j in range(start, stop, step)])
+            return blis._new(self._getrange(start, stop), stop - start)
+        return int(self.test(i))
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._nbits)
+            indices = range(start, stop, step)
+            if not isinstance(value, blis):
+                value = blis(list(value))
+            if len(value) != len(indices):
+                raise ValueError(f'Expected {len(indices)} bits, not {len(value)}, '
+                                 f'bitarray cannot change length.')
+            if step == 1:
+                self._setrange(start, stop, value._value)
+            else:
+                for j, bit in zip(indices, value):
+                    self[j] = bit
+            return
+        if value:
+            self.set(i)
+        else:
+            self.clear(i)
+
+    def _getrange(self, start, stop):
+        # only the bytes of the range are read
+        a, b = start >> 3, -(-stop // 8)
+        x = int.from_bytes(self._buf[a:b], 'little')
+        return x >> (start & 7) & ((1 << (stop - start)) - 1)
+
+    def _setrange(self, start, stop, value):
+        a, b = start >> 3, -(-stop // 8)
+        x = int.from_bytes(self._buf[a:b], 'little')
+        mask = ((1 << (stop - start)) - 1) << (start & 7)
+        x = x & ~mask | value << (start & 7) & mask
+        self._buf[a:b] = x.to_bytes(b - a, 'little')
+
+    #
+    # MANY BITS
+    #
+
+    def fill(self, start=0, stop=None, value=1):
+        """Set (or clear if not value) the bits start to stop."""
+        start, stop, _ = slice(start, stop).indices(self._nbits)
+        if stop <= start:
+            return self
+        buf = self._buf
+        a, b = start >> 3, stop >> 3
+        head = 0xFF << (start & 7) & 0xFF
+        tail = (1 << (stop & 7)) - 1
+        if a == b:
+            head &= tail
+        elif tail:
+            buf[b] = buf[b] | tail if value else buf[b] & ~tail
+        buf[a] = buf[a] | head if value else buf[a] & ~head
+        if b > a + 1:
+            buf[a + 1:b] = (b'\xff' if value else b'\0') * (b - a - 1)
+        return self
+
+    def popcount(self):
+        """Return the number of high bits."""
+        if np is None or not self._nbits:
+            return int(self).bit_count()
+        w = self.words()
+        return int(_popcountMany(w[:-1]).sum()) + (int(w[-1]) & self._tail()).bit_count()
+
+    def find_first_zero(self, start=0):
+        """Return the index of the first low bit from start, -1 if none."""
+        return self._find(0, start)
+
+    def find_first_one(self, start=0):
+        """Return the index of the first high bit from start, -1 if none."""
+        return self._find(1, start)
+
+    def _find(self, value, start):
+        if start >= self._nbits:
+            return -1
+        start = self._index(start)
+        # scan words with numpy, else bytes
+        units, size = (self._buf, 8) if np is None else (self.words(), 64)
+        skip = 0 if value else (1 << size) - 1 # units without the bit looked for
+        i, lo = divmod(start, size)
+        x = (int(units[i]) ^ skip) >> lo << lo
+        if not x:
+            i = self._skip(units, i + 1, skip)
+            if i == len(units):
+                return -1
+            x = int(units[i]) ^ skip
+        bit = size * i + (x & -x).bit_length() - 1
+        return bit if bit < self._nbits else -1
+
+    def _skip(self, units, i, skip):
+        """Return the index of the first unit from i that is not skip."""
+        if np is None:
+            skip, n = bytes([skip]), self.chunksize
+        else:
+            skip, n = np.uint64(skip), self.chunksize // 8
+        while i < len(units):
+            chunk = units[i:i + n]
+            if np is None:
+                k = len(chunk) - len(chunk.lstrip(skip))
+            else:
+                differ = chunk != skip
+                k = int(differ.argmax())
+                k = k if differ[k] else len(chunk)
+            i += k
+            if k < len(chunk):
+                break
+        return i
+
+    def _indices(self, idx):
+        if np is None:
+            raise ImportError('The batch operations requires numpy.')
+        idx = _asintarray(idx).astype(np.intp)
+        if idx.size and not (-self._nbits <= idx.min() and idx.max() < self._nbits):
+            raise IndexError('bitarray index out of range')
+        idx = idx % max(self._nbits, 1)
+        return np.frombuffer(self._buf, dtype=np.uint8), idx >> 3, \
+            (1 << (idx & 7)).astype(np.uint8)
+
+    def setMany(self, idx):
+        """Set the bits at the indices of an array."""
+        view, byte, bit = self._indices(idx)
+        np.bitwise_or.at(view, byte, bit)
+
+    def clearMany(self, idx):
+        """Clear the bits at the indices of an array."""
+        view, byte, bit = self._indices(idx)
+        np.bitwise_and.at(view, byte, ~bit)
+
+    def testMany(self, idx):
+        """Return an array of bools, if the bits at the indices are high."""
+        view, byte, bit = self._indices(idx)
+        return view[byte] & bit != 0
+
+    #
+    # BIT OPERATORS
+    #
+
+    def _inplace(self, op, other):
+        if isinstance(other, blis):
+            other = bitarray.from_blis(other)
+        if not isinstance(other, bitarray):
+            return NotImplemented
+        if other._nbits != self._nbits:
+            raise ValueError(f'Expected bitarrays of the same length, '
+                             f'not {self._nbits} and {other._nbits}.')
+        if np is None:
+            self._setint(op(int(self), int(other)))
+        else:
+            w = self.words()
+            if not len(w):
+                return self
+            # the padding of self, e.g. of a mapped file, is kept as it was
+            pad = w[-1] & np.uint64(~self._tail() & (1 << 64) - 1)
+            op(w, other.words(), out=w)
+            w[-1] = w[-1] & np.uint64(self._tail()) | pad
+        return self
+
+    def __iand__(self, other):
+        return self._inplace(np.bitwise_and if np else int.__and__, other)
+
+    def __ior__(self, other):
+        return self._inplace(np.bitwise_or if np else int.__or__, other)
+
+    def __ixor__(self, other):
+        return self._inplace(np.bitwise_xor if np else int.__xor__, other)
+
+    def __and__(self, other):
+        return self.copy().__iand__(other)
+
+    def __or__(self, other):
+        return self.copy().__ior__(other)
+
+    def __xor__(self, other):
+        return self.copy().__ixor__(other)
+
+    def __invert__(self):
+        other = self.copy()
+        if np is None:
+            other._setint(~int(self))
+        else:
+            w = other.words()
+            np.invert(w, out=w)
+            # the copy owns its buffer, its padding is made low
+            if len(w):
+                w[-1] &= np.uint64(self._tail())
+        return other
+
+
+#
+# FIXED WIDTH
+#
+
+def _fixedoperand(x):
+    """The int of an operand of fixedint, None if x is not integral."""
+    if type(x) is int:
+        return x
+    if isinstance(x, fixedint):
+        return x._value
+    if isinstance(x, Integral):
+        return int(x)
+    return None
+
+def _fixedop(op, wrap=False, reflected=False):
+    # self @ other (or other @ self if reflected), fitted to the type of self
+    def method(self, other):
+        if type(other) is not int:
+            other = _fixedoperand(other)
+            if other is None:
+                return NotImplemented
+        new = object.__new__(type(self))
+        value = op(other, self._value) if reflected else op(self._value, other)
+        new._value = self._wrap(value) if wrap else self._fit(value)
+        return new
+    return method
+
+def _fixedcmp(op):
+    # compared by value, also to floats and other reals as ints are
+    def method(self, other):
+        value = _fixedoperand(other)
+        if value is None:
+            if not isinstance(other, Real):
+                return NotImplemented
+            value = other
+        return op(self._value, value)
+    return method
+
+
+class fixedint(Integral):
+    """
+    Base of the fixed width ints, see fixedtype.
+
+    An instance holds one int within the range of its type. Results of
+    arithmetic wrap around (two's complement), or saturate at min or max for
+    saturating types. Bitwise operators and shifts always wrap. The result
+    has the type of the left operand, also for the reflected operators, e.g.
+    1 - u8(2) is u8(255).
+
+    >> u8(250) + 10
+    u8(4)
+    >> fixedtype(8, saturating=True)(250) + 10
+    u8sat(255)
+    """
+
+    __slots__ = ('_value',)
+
+    # set by fixedtype
+    nbits = signed = saturating = min = max = mask = None
+
+    def __init__(self, value=0):
+        self._value = self._fit(int(value))
+
+    @classmethod
+    def _raw(cls, value):
+        """Create from a value already in range."""
+        self = object.__new__(cls)
+        self._value = value
+        return self
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._value})'
+
+    def __str__(self):
+        return str(self._value)
+
+    def __format__(self, spec):
+        return format(self._value, spec)
+
+    def __int__(self):
+        return self._value
+
+    __index__ = __int__
+
+    def __hash__(self):
+        return hash(self._value)
+
+    def __bool__(self):
+        return self._value != 0
+
+    def __reduce__(self):
+        return _fixedvalue, (self.nbits, self.signed, self.saturating, self._value)
+
+    #
+    # BITS
+    #
+
+    @property
+    def unsigned(self):
+        """The bit pattern as an unsigned int."""
+        return self._value & self.mask
+
+    def to_blis(self):
+        return blis._new(self.unsigned, self.nbits)
+
+    def rotl(self, n=1):
+        """Rotate the bits n steps towards the MSB."""
+        n %= self.nbits
+        x = self.unsigned
+        return self._raw(self._wrap(x << n | x >> (self.nbits - n)))
+
+    def rotr(self, n=1):
+        """Rotate the bits n steps towards the LSB."""
+        return self.rotl(-n)
+
+    def byteswap(self):
+        """Reverse the order of the bytes, nbits must be whole bytes."""
+        if self.nbits % 8:
+            raise ValueError(f'Cannot byteswap {self.nbits} bits.')
+        x = self.unsigned.to_bytes(self.nbits // 8, 'little')
+        return self._raw(self._wrap(int.from_bytes(x, 'big')))
+
+    def popcount(self):
+        return self.unsigned.bit_count()
+
+    #
+    # MATH OPERATORS
+    #
+
+    __add__ = _fixedop(operator.add)
+    __radd__ = _fixedop(operator.add, reflected=True)
+    __sub__ = _fixedop(operator.sub)
+    __rsub__ = _fixedop(operator.sub, reflected=True)
+    __mul__ = _fixedop(operator.mul)
+    __rmul__ = _fixedop(operator.mul, reflected=True)
+    __floordiv__ = _fixedop(operator.floordiv)
+    __rfloordiv__ = _fixedop(operator.floordiv, reflected=True)
+    __mod__ = _fixedop(operator.mod)
+    __rmod__ = _fixedop(operator.mod, reflected=True)
+
+    def __truediv__(self, other):
+        return self._value / other
+
+    def __rtruediv__(self, other):
+        return other / self._value
+
+    def __pow__(self, other, mod=None):
+        e = _fixedoperand(other)
+        if e is None:
+            return NotImplemented
+        if mod is not None:
+            return self._raw(self._fit(pow(self._value, e, int(mod))))
+        if e < 0:
+            raise ValueError('Expected a non-negative exponent.')
+        if not self.saturating:
+            return self._raw(self._wrap(pow(self._value, e, 1 << self.nbits)))
+        if abs(self._value) > 1 and e > self.nbits:
+            # out of range anyway, only the sign matters
+            e = self.nbits + 1 + (e - self.nbits - 1) % 2
+        return self._raw(self._fit(self._value ** e))
+
+    def __rpow__(self, other):
+        other = _fixedoperand(other)
+        if other is None:
+            return NotImplemented
+        return self._raw(self._fit(other)) ** self._value
+
+    def __neg__(self):
+        return self._raw(self._fit(-self._value))
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self._raw(self._fit(abs(self._value)))
+
+    def __trunc__(self):
+        return self._value
+
+    __floor__ = __ceil__ = __trunc__
+
+    def __round__(self, ndigits=None):
+        return self._value if ndigits is None else self._raw(self._fit(round(self._value, ndigits)))
+
+    #
+    # BIT OPERATORS
+    #
+
+    __and__ = _fixedop(operator.and_, True)
+    __rand__ = _fixedop(operator.and_, True, True)
+    __or__ = _fixedop(operator.or_, True)
+    __ror__ = _fixedop(operator.or_, True, True)
+    __xor__ = _fixedop(operator.xor, True)
+    __rxor__ = _fixedop(operator.xor, True, True)
+    __lshift__ = _fixedop(operator.lshift, True)
+    __rlshift__ = _fixedop(operator.lshift, True, True)
+    # >> is arithmetic for signed types
+    __rshift__ = _fixedop(operator.rshift, True)
+    __rrshift__ = _fixedop(operator.rshift, True, True)
+
+    def __invert__(self):
+        return self._raw(self._wrap(~self._value))
+
+    #
+    # COMPARISON
+    #
+
+    __eq__ = _fixedcmp(operator.eq)
+    __lt__ = _fixedcmp(operator.lt)
+    __le__ = _fixedcmp(operator.le)
+    __gt__ = _fixedcmp(operator.gt)
+    __ge__ = _fixedcmp(operator.ge)
+
+
+def fixedtype(nbits, signed=False, saturating=False):
+    """
+    Return the fixed width int type of nbits, e.g. fixedtype(8) is u8.
+
+    The type is made once and then cached, the names are u<nbits> and
+    i<nbits>, with a suffix sat if saturating.
+    """
+    return _fixedtype(nbits, bool(signed), bool(saturating))
+
+def _fixedvalue(nbits, signed, saturating, value):
+    # for pickle, the types are not module attributes
+    return _fixedtype(nbits, signed, saturating)(value)
+
+@lru_cache(maxsize=None)
+def _fixedtype(nbits, signed, saturating):
+    if nbits < 1:
+        raise ValueError(f'Expected nbits to be positive, not {nbits}.')
+    mask = (1 << nbits) - 1
+    lo = -(1 << (nbits - 1)) if signed else 0
+    hi = lo + mask
+
+    def wrap(v):
+        return ((v - lo) & mask) + lo
+
+    def clamp(v):
+        return lo if v < lo else hi if v > hi else v
+
+    name = f"{'i' if signed else 'u'}{nbits}{'sat' if saturating else ''}"
+    return type(name, (fixedint,), {
+        '__slots__': (), '__module__': __name__,
+        'nbits': nbits, 'signed': signed, 'saturating': saturating,
+        'min': lo, 'max': hi, 'mask': mask,
+        '_wrap': staticmethod(wrap), '_fit': staticmethod(clamp if saturating else wrap),
+    })
+
+u8, u16, u32, u64 = (fixedtype(n) for n in (8, 16, 32, 64))
+i8, i16, i32, i64 = (fixedtype(n, True) for n in (8, 16, 32, 64))
+
+
+class fixedarray(MutableSequence):
+    """
+    A packed array of one fixed width int type, kept in an array.array.
+
+    >> a = fixedarray(u8, [250, 251, 252])
+    >> a + 10
+    fixedarray(u8, [4, 5, 6])
+
+    The operators are elementwise, with another fixedarray of the same
+    length or with an int, and the result has the type of self. With numpy
+    the wrapping 8, 16, 32 and 64-bit types are computed in one go, see
+    numpy(), the rest one element at a time.
+    """
+
+    def __init__(self, type, values=()):
+        self.type = type
+        self._data = array(self._typecode(type), map(type._fit, map(int, values)))
+
+    @staticmethod
+    def _typecode(t):
+        nbytes = -(-t.nbits // 8)
+        for code in ('bhilq' if t.signed else 'BHILQ'):
+            if array(code).itemsize >= nbytes:
+                return code
+        raise TypeError(f'No array type for {t.__name__}.')
+
+    def _new(self, data):
+        other = fixedarray(self.type)
+        other._data = data
+        return other
+
+    def numpy(self):
+        """Return the elements as a numpy array, sharing memory."""
+        if np is None:
+            raise ImportError('fixedarray.numpy requires numpy.')
+        return np.frombuffer(self._data, dtype=self._data.typecode)
+
+    def tolist(self):
+        return self._data.tolist()
+
+    def __repr__(self):
+        return f'fixedarray({self.type.__name__}, {self._data.tolist()})'
+
+    def __eq__(self, other):
+        if not isinstance(other, fixedarray):
+            return NotImplemented
+        return self.type is other.type and self._data == other._data
+
+    #
+    # MANAGEMENT
+    #
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._new(self._data[i])
+        return self.type._raw(self._data[i])
+
+    def __setitem__(self, i, value):
+        fit = self.type._fit
+        if isinstance(i, slice):
+            self._data[i] = array(self._data.typecode, (fit(int(v)) for v in value))
+        else:
+            self._data[i] = fit(int(value))
+
+    def __delitem__(self, i):
+        del self._data[i]
+
+    def insert(self, i, value):
+        self._data.insert(i, self.type._fit(int(value)))
+
+    #
+    # ELEMENTWISE
+    #
+
+    _npops = {operator.add: 'add', operator.sub: 'subtract', operator.mul: 'multiply',
+              operator.and_: 'bitwise_and', operator.or_: 'bitwise_or',
+              operator.xor: 'bitwise_xor'}
+
+    def _vectorized(self):
+        t = self.type
+        return np is not None and not t.saturating and t.nbits == 8 * self._data.itemsize
+
+    def _elementwise(self, op, other, reflected=False, fit='_fit'):
+        if isinstance(other, fixedarray):
+            if len(other) != len(self):
+                raise ValueError(f'Expected arrays of the same length, '
+                                 f'not {len(self)} and {len(other)}.')
+            b = other._data
+        else:
+            b = _fixedoperand(other)
+            if b is None:
+                return NotImplemented
+        t = self.type
+        if op in self._npops and self._vectorized():
+            a = self.numpy()
+            if isinstance(other, fixedarray):
+                # wrap to the type of self first, numpy would promote mixed types
+                b = other.numpy().astype(a.dtype, copy=False)
+            else:
+                b = a.dtype.type(t._wrap(b))
+            c = getattr(np, self._npops[op])(*((b, a) if reflected else (a, b)))
+            return self._new(array(self._data.typecode, c.astype(a.dtype).tobytes()))
+        fit = getattr(t, fit)
+        a = self._data
+        b = b if isinstance(other, fixedarray) else [b] * len(a)
+        if reflected:
+            a, b = b, a
+        return self._new(array(self._data.typecode, map(fit, map(op, a, b))))
+
+    def __add__(self, other):
+        return self._elementwise(operator.add, other)
+
+    def __radd__(self, other):
+        return self._elementwise(operator.add, other, True)
+
+    def __sub__(self, other):
+        return self._elementwise(operator.sub, other)
+
+    def __rsub__(self, other):
+        return self._elementwise(operator.sub, other, True)
+
+    def __mul__(self, other):
+        return self._elementwise(operator.mul, other)
+
+    def __rmul__(self, other):
+        return self._elementwise(operator.mul, other, True)
+
+    def __and__(self, other):
+        return self._elementwise(operator.and_, other, fit='_wrap')
+
+    __rand__ = __and__
+
+    def __or__(self, other):
+        return self._elementwise(operator.or_, other, fit='_wrap')
+
+    __ror__ = __or__
+
+    def __xor__(self, other):
+        return self._elementwise(operator.xor, other, fit='_wrap')
+
+    __rxor__ = __xor__
+
+    def __lshift__(self, other):
+        return self._elementwise(operator.lshift, other, fit='_wrap')
+
+    def __rshift__(self, other):
+        return self._elementwise(operator.rshift, other, fit='_wrap')
+
+    def __iadd__(self, other):
+        # MutableSequence would extend
+        result = self + other
+        if result is NotImplemented:
+            return result
+        self._data = result._data
+        return self
+
+    def rotl(self, n=1):
+        """Rotate the bits of each element n steps towards the MSB."""
+        t = self.type
+        n %= t.nbits
+        if not n or not self._vectorized():
+            return self._new(array(self._data.typecode, (t._raw(x).rotl(n)._value
+                                                         for x in self._data)))
+        u = self.numpy().view(np.dtype(self._data.typecode.upper()))
+        c = u << u.dtype.type(n) | u >> u.dtype.type(t.nbits - n)
+        return self._new(array(self._data.typecode, c.tobytes()))
+
+    def rotr(self, n=1):
+        """Rotate the bits of each element n steps towards the LSB."""
+        return self.rotl(-n)
+
+    def byteswap(self):
+        """Reverse the order of the bytes of each element."""
+        t = self.type
+        if t.nbits != 8 * self._data.itemsize:
+            return self._new(array(self._data.typecode,
+                                   (t._raw(x).byteswap()._value for x in self._data)))
+        data = array(self._data.typecode, self._data)
+        data.byteswap()
+        return self._new(data)
+
+
+#
+# BIT FIELDS
+#
+
+class BitLayout:
+    """
+    Named bit fields of a word, compiled to shifts and masks.
+
+    Each field is (name, offset, width) or (name, offset, width, signed),
+    offset is the index of its LSB. Fields must not overlap. nbits defaults
+    to the end of the highest field.
+
+    >> ctrl = BitLayout(('mode', 0, 3), ('enable', 3, 1), ('offset', 4, 12, True))
+    >> ctrl.pack(mode=5, enable=1, offset=-2)
+    65517 # 0xFFED
+    >> ctrl.unpack(0xFFED)
+    {'mode': 5, 'enable': 1, 'offset': -2}
+
+    The *Many methods take numpy arrays of words (up to 64 bits) and give
+    one column per field, with the smallest dtype that fits the field.
+    """
+
+    def __init__(self, *fields, nbits=None):
+        self.fields = []
+        used = 0
+        for field in fields:
+            name, offset, width, signed = (*field, False)[:4]
+            if offset < 0 or width < 1:
+                raise ValueError(f'Expected offset >= 0 and width >= 1 for {name!r}, '
+                                 f'not {offset} and {width}.')
+            mask = ((1 << width) - 1) << offset
+            if used & mask:
+                raise ValueError(f'Field {name!r} overlaps another field.')
+            used |= mask
+            self.fields.append((name, offset, width, bool(signed)))
+        if len({f[0] for f in self.fields}) != len(self.fields):
+            raise ValueError('Expected unique field names.')
+        self.nbits = nbits or used.bit_length()
+        if used >> self.nbits:
+            raise ValueError(f'The fields do not fit in {self.nbits} bits.')
+        self.mask = used
+        # name: (shift, mask, sign bit or 0)
+        self._compiled = {name: (offset, (1 << width) - 1, signed << (width - 1))
+                          for name, offset, width, signed in self.fields}
+        self._items = tuple((name, *c) for name, c in self._compiled.items())
+
+    def __repr__(self):
+        fields = ', '.join(repr(f) for f in self.fields)
+        return f'BitLayout({fields}, nbits={self.nbits})'
+
+    @property
+    def names(self):
+        return [f[0] for f in self.fields]
+
+    #
+    # SINGLE WORDS
+    #
+
+    def unpack(self, word):
+        """Return a dict of the fields of word."""
+        return {name: (word >> shift & mask ^ sign) - sign
+                for name, shift, mask, sign in self._items}
+
+    def pack(self, **fields):
+        """Return the word of the fields given, fields not given are 0."""
+        return self.set(0, **fields)
+
+    def get(self, word, name):
+        shift, mask, sign = self._compiled[name]
+        return (word >> shift & mask ^ sign) - sign
+
+    def set(self, word, **fields):
+        """Return word with the fields given replaced."""
+        for name, value in fields.items():
+            try:
+                shift, mask, sign = self._compiled[name]
+            except KeyError:
+                raise TypeError(f'No field named {name!r}.') from None
+            if not -sign <= value <= mask - sign:
+                raise ValueError(f'{value} does not fit in field {name!r}.')
+            word = word & ~(mask << shift) | (value & mask) << shift
+        return word
+
+    #
+    # BATCH
+    #
+
+    def _dtype(self, name):
+        _, _, width, signed = self.fields[self.names.index(name)]
+        size = next(n for n in (8, 16, 32, 64) if width <= n)
+        return np.dtype(f"{'i' if signed else 'u'}{size // 8}")
+
+    def _words(self, words):
+        words = _asintarray(words)
+        if self.nbits > 64:
+            raise TypeError('The batch operations take words of at most 64 bits.')
+        # work on the bit patterns
+        return words.view(words.dtype.str.replace('i', 'u'))
+
+    def unpackMany(self, words):
+        """Return a dict of one array per field, from an array of words."""
+        words = self._words(words)
+        nbits = 8 * words.itemsize
+        columns = {}
+        for name, shift, mask, sign in self._items:
+            dtype = self._dtype(name)
+            if sign:
+                # move the field to the top, then shift back with sign
+                top = nbits - shift - mask.bit_length()
+                x = (words << words.dtype.type(top)).view(words.dtype.str.replace('u', 'i'))
+                x = x >> x.dtype.type(nbits - mask.bit_length())
+            else:
+                x = words >> words.dtype.type(shift) & words.dtype.type(mask)
+            columns[name] = x.astype(dtype)
+        return columns
+
+    def unpackStructured(self, words):
+        """As unpackMany, but one structured array."""
+        columns = self.unpackMany(words)
+        out = np.empty(len(next(iter(columns.values()), ())),
+                       dtype=[(name, col.dtype) for name, col in columns.items()])
+        for name, col in columns.items():
+            out[name] = col
+        return out
+
+    def packMany(self, dtype=None, **columns):
+        """Return an array of words from arrays of fields, see pack."""
+        if np is None:
+            raise ImportError('The batch operations requires numpy.')
+        dtype = np.dtype(dtype or f'u{next(n for n in (1, 2, 4, 8) if self.nbits <= 8 * n)}')
+        shape = np.broadcast_shapes(*(np.shape(c) for c in columns.values()))
+        words = np.zeros(shape, dtype=dtype)
+        for name, col in columns.items():
+            try:
+                shift, mask, sign = self._compiled[name]
+            except KeyError:
+                raise TypeError(f'No field named {name!r}.') from None
+            col = np.asarray(col)
+            if col.size and not (-sign <= col.min() and col.max() <= mask - sign):
+                raise ValueError(f'Values do not fit in field {name!r}.')
+            col = col.astype(np.int64 if sign else np.uint64).view(np.uint64)
+            words |= ((col & np.uint64(mask)) << np.uint64(shift)).astype(dtype)
+        return words
+
+
+#
+# Hamming
+#
+
+def _bytetables(contribs):
+    """
+    Build lookup tables for a linear map given by the contribution of each bit.
+
+    Table b maps the value of byte b of the input to the XOR of the
+    contributions of its high bits.
+    """
+    tables = []
+    for b in range(0, len(contribs), 8):
+        table = [0]
+        for c in contribs[b:b + 8]:
+            table += [x ^ c for x in table]
+        tables.append(table + [0] * (256 - len(table)))
+    return tables
+
+def _lookup(tables, x):
+    r = 0
+    for table in tables:
+        r ^= table[x & 0xFF]
+        x >>= 8
+    return r
+
+def _lookupMany(tables, a):
+    r = np.zeros(a.shape, dtype=np.uint64)
+    a = a.astype(np.uint64)
+    for b, table in enumerate(tables):
+        r ^= table[(a >> np.uint64(8 * b)) & np.uint64(0xFF)]
+    return r
+
+
+class Hamming:
+    """
+    Hamming code, corrects single bit errors.
+
+    Hamming(7, 4), Hamming(15, 11), ... or a shortened code with fewer data
+    bits, e.g. Hamming(71, 64). With extended=True one more parity bit over
+    the whole codeword is added, which also detects double errors (SECDED),
+    e.g. Hamming(72, 64, extended=True).
+
+    In a codeword bit i is position i+1 of the code. The parity bits are at
+    the positions 2**t and the data bits fill the other positions in order.
+    The extra parity bit of an extended code is the MSB.
+
+    >> ham = Hamming(7, 4)
+    >> ham.encode(0b1011)
+    85 # 0b1010101
+    >> ham.decode(0b1010101 ^ 0b100)
+    (11, 1)
+
+    The check bits can also be kept apart from the data, as in ECC memory,
+    with checkbits and correct. In the check bits, bit t is the parity bit at
+    position 2**t and bit r is the extra parity bit.
+
+    decode and correct return the data and a status,
+        OK - no error
+        CORRECTED - a single error was corrected
+        UNCORRECTABLE - an error was detected but could not be corrected
+
+    Everything is done with lookup tables, one per byte of input. The *Many
+    methods do the same on numpy arrays of words, as long as they fit in
+    uint64.
+    """
+
+    OK, CORRECTED, UNCORRECTABLE = 0, 1, 2
+
+    def __init__(self, n, k, extended=False):
+        """
+        Create a Hamming code of n bits per codeword, k of which are data.
+        """
+        self.n = n
+        self.k = k
+        self.extended = extended
+        self.r = r = n - k - extended # number of position parity bits
+        if k < 1 or r < 2 or (k + r).bit_length() != r:
+            raise ValueError(f'There is no Hamming code with n={n}, k={k}'
+                             f'{" (extended)" if extended else ""}.')
+        m = k + r # codeword bits without the extra parity bit
+
+        self.positions = [p for p in range(1, m + 1) if p & (p - 1)]
+
+        # check bits and codeword bits of each data bit
+        checks, words = [], []
+        for p in self.positions:
+            c = p
+            if extended:
+                c |= (1 + p.bit_count()) % 2 << r
+            w = 1 << (p - 1)
+            for t in range(r):
+                if c >> t & 1:
+                    w |= 1 << ((1 << t) - 1)
+            if extended and c >> r:
+                w |= 1 << m
+            checks.append(c)
+            words.append(w)
+        self._checktables = _bytetables(checks)
+        self._encodetables = _bytetables(words)
+
+        # syndrome and total parity, and data, of each codeword bit
+        syndromes, gathers = [], []
+        data = {p: 1 << j for j, p in enumerate(self.positions)}
+        for i in range(n):
+            s = i + 1 if i < m else 0
+            if extended:
+                s |= 1 << r
+            syndromes.append(s)
+            gathers.append(data.get(i + 1, 0))
+        self._syndrometables = _bytetables(syndromes)
+        self._gathertables = _bytetables(gathers)
+
+        # data bit to flip for each syndrome
+        self._flip = [data.get(s, 0) for s in range(1 << r)]
+        self._np = {}
+
+    def __repr__(self):
+        return f'Hamming({self.n}, {self.k}{", extended=True" if self.extended else ""})'
+
+    def _fix(self, data, s, p):
+        """Correct data given syndrome s and total parity p."""
+        if self.extended and not p:
+            return data, self.UNCORRECTABLE if s else self.OK
+        if not s:
+            # if extended, the extra parity bit was wrong
+            return data, self.CORRECTED if self.extended else self.OK
+        if s > self.k + self.r:
+            return data, self.UNCORRECTABLE
+        return data ^ self._flip[s], self.CORRECTED
+
+    #
+    # CODEWORDS
+    #
+
+    def encode(self, data):
+        """Return the codeword of data."""
+        return _lookup(self._encodetables, data & ((1 << self.k) - 1))
+
+    def decode(self, word):
+        """Return the data of a codeword, and a status."""
+        word &= (1 << self.n) - 1
+        x = _lookup(self._syndrometables, word)
+        data = _lookup(self._gathertables, word)
+        return self._fix(data, x & ((1 << self.r) - 1), x >> self.r)
+
+    #
+    # CHECK BITS
+    #
+
+    def checkbits(self, data):
+        """Return the check bits of data."""
+        return _lookup(self._checktables, data & ((1 << self.k) - 1))
+
+    def correct(self, data, check):
+        """Return data corrected with its check bits, and a status."""
+        data &= (1 << self.k) - 1
+        x = _lookup(self._checktables, data) ^ check
+        s = x & ((1 << self.r) - 1)
+        return self._fix(data, s, (x >> self.r ^ s.bit_count()) & 1)
+
+    #
+    # BATCH
+    #
+
+    def _tables(self, name, nbits):
+        if np is None:
+            raise ImportError('The batch operations requires numpy.')
+        if nbits > 64:
+            raise ValueError(f'Words of {nbits} bits do not fit in uint64.')
+        if name not in self._np:
+            tables = getattr(self, name)
+            self._np[name] = np.array(tables, dtype=np.uint64)
+        return self._np[name]
+
+    def _fixMany(self, data, s, p):
+        m = self.k + self.r
+        if self.extended:
+            status = np.where(p == 0, np.where(s == 0, self.OK, self.UNCORRECTABLE),
+                              np.where(s <= m, self.CORRECTED, self.UNCORRECTABLE))
+        else:
+            status = np.where(s == 0, self.OK,
+                              np.where(s <= m, self.CORRECTED, self.UNCORRECTABLE))
+        # the scalar _fix leaves uncorrectable data as it is, so must we
+        flip = self._tables('_flip', self.k)[np.where(s <= m, s, 0)]
+        data ^= np.where(status == self.CORRECTED, flip, np.uint64(0))
+        return data, status.astype(np.uint8)
+
+    def encodeMany(self, data):
+        """Return the codewords of an array of data, as uint64."""
+        tables = self._tables('_encodetables', self.n)
+        return _lookupMany(tables, np.asarray(data, dtype=np.uint64) & np.uint64((1 << self.k) - 1))
+
+    def decodeMany(self, words):
+        """Return the data of an array of codewords as uint64, and the statuses."""
+        words = np.asarray(words, dtype=np.uint64) & np.uint64((1 << self.n) - 1)
+        x = _lookupMany(self._tables('_syndrometables', self.n), words)
+        data = _lookupMany(self._tables('_gathertables', self.n), words)
+        s = (x & np.uint64((1 << self.r) - 1)).astype(np.intp)
+        return self._fixMany(data, s, x >> np.uint64(self.r))
+
+    def checkbitsMany(self, data):
+        """Return the check bits of an array of data, as uint64."""
+        tables = self._tables('_checktables', self.k)
+        return _lookupMany(tables, np.asarray(data, dtype=np.uint64) & np.uint64((1 << self.k) - 1))
+
+    def correctMany(self, data, check):
+        """Return an array of data corrected with its check bits, and the statuses."""
+        data = np.asarray(data, dtype=np.uint64) & np.uint64((1 << self.k) - 1)
+        x = self.checkbitsMany(data) ^ np.asarray(check, dtype=np.uint64)
+        s = (x & np.uint64((1 << self.r) - 1)).astype(np.intp)
+        p = (x >> np.uint64(self.r) ^ _popcountMany(s).astype(np.uint64)) & np.uint64(1)
+        return self._fixMany(data, s, p)
+
+
+#
+# CHECKSUM
+#
+
+def _isbuffer(obj):
+    """If obj is bytes-like, e.g. an mmap, which also has read."""
+    try:
+        memoryview(obj).release()
+    except TypeError:
+        return False
+    return True
+
+class Checksum:
+    """
+    Base of the incremental checksums, CRC, Fletcher and Adler32.
+
+    Subclasses keep their state in _reg and set _update(reg, chunk), which
+    returns the state after the bytes of chunk. Data is fed in chunks of at
+    most chunksize bytes, files are read into a reused buffer of that size.
+    """
+
+    chunksize = 1 << 20
+
+    def update(self, data):
+        """
+        Feed data to the checksum, can be called many times.
+
+        data is either a bytes-like object (bytes, bytearray, memoryview,
+        mmap, ...) or a binary file object.
+        """
+        if hasattr(data, 'read') and not _isbuffer(data):
+            self._reg = self._readfrom(self._reg, data, self._update)
+        else:
+            self._reg = self._feed(self._reg, data, self._update)
+        return self
+
+    def updatefile(self, path, usemmap=True):
+        """Feed the content of the file at path, through mmap if usemmap."""
+        with open(path, 'rb') as f:
+            if usemmap and os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    self._reg = self._feed(self._reg, mm, self._update)
+            else:
+                self._reg = self._readfrom(self._reg, f, self._update)
+        return self
+
+    def _feed(self, reg, data, update):
+        with memoryview(data) as mv, mv.cast('B') as mv:
+            for i in range(0, len(mv), self.chunksize):
+                with mv[i:i + self.chunksize] as chunk:
+                    reg = update(reg, chunk)
+            self.nbytes += len(mv)
+        return reg
+
+    def _readfrom(self, reg, f, update):
+        if not hasattr(f, 'readinto'):
+            for chunk in iter(partial(f.read, self.chunksize), b''):
+                reg = self._feed(reg, chunk, update)
+            return reg
+        buf = bytearray(self.chunksize)
+        with memoryview(buf) as mv:
+            while n := f.readinto(buf):
+                with mv[:n] as chunk:
+                    reg = update(reg, chunk)
+                self.nbytes += n
+        return reg
+
+
+#
+# CRC
+#
+
+def reflect(x, nbits):
+    """Reverse the order of the nbits first bits of x."""
+    return int(format(x, f'0{nbits}b')[::-1], 2) if nbits else 0
+
+@lru_cache(maxsize=None)
+def _crctables(poly, width, reflected, nslices):
+    """
+    Build the lookup tables of a CRC, one table per slice.
+
+    For a normal (MSB first) CRC the register is shifted up to a whole number
+    of bytes, i.e. width + (-width % 8) bits. For a reflected (LSB first) CRC
+    the poly is reflected instead.
+
+    Table k gives the effect of a byte followed by k zero bytes.
+    """
+    table = []
+    if reflected:
+        rpoly = reflect(poly, width)
+        for i in range(256):
+            c = i
+            for _ in range(8):
+                c = (c >> 1) ^ rpoly if c & 1 else c >> 1
+            table.append(c)
+        tables = [table]
+        for _ in range(1, nslices):
+            prev = tables[-1]
+            tables.append([(c >> 8) ^ table[c & 0xFF] for c in prev])
+    else:
+        nbits = width + (-width % 8)
+        top, mask = 1 << (nbits - 1), (1 << nbits) - 1
+        spoly = poly << (nbits - width)
+        for i in range(256):
+            c = i << (nbits - 8)
+            for _ in range(8):
+                c = ((c << 1) ^ spoly if c & top else c << 1) & mask
+            table.append(c)
+        tables = [table]
+        for _ in range(1, nslices):
+            prev = tables[-1]
+            tables.append([(c << 8) & mask ^ table[c >> (nbits - 8)] for c in prev])
+    return tuple(tables)
+
+def _crc_reflected(reg, data, tables):
+    """Feed the bytes of data to a reflected register."""
+    t0 = tables[0]
+    n = 0
+    if len(tables) == 8:
+        t1, t2, t3, t4, t5, t6, t7 = tables[1:]
+        n = len(data) // 8
+        for v in struct.unpack_from(f'<{n}Q', data):
+            x = reg ^ v
+            reg = (reg >> 64) ^ t7[x & 0xFF] ^ t6[x >> 8 & 0xFF] \
+                ^ t5[x >> 16 & 0xFF] ^ t4[x >> 24 & 0xFF] ^ t3[x >> 32 & 0xFF] \
+                ^ t2[x >> 40 & 0xFF] ^ t1[x >> 48 & 0xFF] ^ t0[x >> 56 & 0xFF]
+        n *= 8
+    elif len(tables) == 4:
+        t1, t2, t3 = tables[1:]
+        n = len(data) // 4
+        for v in struct.unpack_from(f'<{n}I', data):
+            x = reg ^ v
+            reg = (reg >> 32) ^ t3[x & 0xFF] ^ t2[x >> 8 & 0xFF] \
+                ^ t1[x >> 16 & 0xFF] ^ t0[x >> 24 & 0xFF]
+        n *= 4
+    for b in data[n:]:
+        reg = t0[(reg ^ b) & 0xFF] ^ (reg >> 8)
+    return reg
+
+def _crc_normal(reg, data, tables, nbits):
+    """Feed the bytes of data to a normal register of nbits (multiple of 8)."""
+    t0 = tables[0]
+    mask = (1 << nbits) - 1
+    n = 0
+    if len(tables) == 8:
+        t1, t2, t3, t4, t5, t6, t7 = tables[1:]
+        n = len(data) // 8
+        for v in struct.unpack_from(f'>{n}Q', data):
+            x = (reg << 64) >> nbits ^ v
+            reg = (reg << 64) & mask ^ t0[x & 0xFF] ^ t1[x >> 8 & 0xFF] \
+                ^ t2[x >> 16 & 0xFF] ^ t3[x >> 24 & 0xFF] ^ t4[x >> 32 & 0xFF] \
+                ^ t5[x >> 40 & 0xFF] ^ t6[x >> 48 & 0xFF] ^ t7[x >> 56 & 0xFF]
+        n *= 8
+    elif len(tables) == 4:
+        t1, t2, t3 = tables[1:]
+        n = len(data) // 4
+        for v in struct.unpack_from(f'>{n}I', data):
+            x = (reg << 32) >> nbits ^ v
+            reg = (reg << 32) & mask ^ t0[x & 0xFF] ^ t1[x >> 8 & 0xFF] \
+                ^ t2[x >> 16 & 0xFF] ^ t3[x >> 24 & 0xFF]
+        n *= 4
+    shift = nbits - 8
+    for b in data[n:]:
+        reg = t0[(reg >> shift) ^ b] ^ (reg << 8) & mask
+    return reg
+
+
+class CRC(Checksum):
+    """
+    Cyclic redundancy check.
+
+    The CRC is given by the Rocksoft model, i.e. width, poly, init, refin,
+    refout and xorout. The poly is given without its highest term (x^width).
+    Known CRCs are found in CRC.catalogue and created with CRC.named.
+
+    >> crc = CRC(0x04C11DB7, 32, init=0xFFFFFFFF, refin=True, xorout=0xFFFFFFFF)
+    >> crc.update(b'123456789').digest()
+    3421780262 # 0xCBF43926
+
+    Bytes are fed through lookup tables, one byte at a time (nslices=1) or
+    4 or 8 bytes at a time (nslices=4, 8). CRC-32/ISO-HDLC and the
+    0x1021 16-bit CRCs use zlib and binascii directly.
+
+    Data is fed in chunks of at most chunksize bytes, files are read into a
+    reused buffer of that size, so memory use does not depend on the size of
+    the data.
+    """
+
+    # name: (width, poly, init, refin, refout, xorout, check)
+    # check is the CRC of b'123456789'
+    catalogue = {
+        'CRC-8/SMBUS':          (8, 0x07, 0x00, False, False, 0x00, 0xF4),
+        'CRC-8/AUTOSAR':        (8, 0x2F, 0xFF, False, False, 0xFF, 0xDF),
+        'CRC-8/BLUETOOTH':      (8, 0xA7, 0x00, True, True, 0x00, 0x26),
+        'CRC-8/CDMA2000':       (8, 0x9B, 0xFF, False, False, 0x00, 0xDA),
+        'CRC-8/DARC':           (8, 0x39, 0x00, True, True, 0x00, 0x15),
+        'CRC-8/I-CODE':         (8, 0x1D, 0xFD, False, False, 0x00, 0x7E),
+        'CRC-8/I-432-1':        (8, 0x07, 0x00, False, False, 0x55, 0xA1),
+        'CRC-8/MAXIM-DOW':      (8, 0x31, 0x00, True, True, 0x00, 0xA1),
+        'CRC-8/ROHC':           (8, 0x07, 0xFF, True, True, 0x00, 0xD0),
+        'CRC-8/SAE-J1850':      (8, 0x1D, 0xFF, False, False, 0xFF, 0x4B),
+        'CRC-8/WCDMA':          (8, 0x9B, 0x00, True, True, 0x00, 0x25),
+        'CRC-16/ARC':           (16, 0x8005, 0x0000, True, True, 0x0000, 0xBB3D),
+        'CRC-16/DECT-X':        (16, 0x0589, 0x0000, False, False, 0x0000, 0x007F),
+        'CRC-16/DNP':           (16, 0x3D65, 0x0000, True, True, 0xFFFF, 0xEA82),
+        'CRC-16/GENIBUS':       (16, 0x1021, 0xFFFF, False, False, 0xFFFF, 0xD64E),
+        'CRC-16/IBM-3740':      (16, 0x1021, 0xFFFF, False, False, 0x0000, 0x29B1),
+        'CRC-16/IBM-SDLC':      (16, 0x1021, 0xFFFF, True, True, 0xFFFF, 0x906E),
+        'CRC-16/KERMIT':        (16, 0x1021, 0x0000, True, True, 0x0000, 0x2189),
+        'CRC-16/MAXIM-DOW':     (16, 0x8005, 0x0000, True, True, 0xFFFF, 0x44C2),
+        'CRC-16/MCRF4XX':       (16, 0x1021, 0xFFFF, True, True, 0x0000, 0x6F91),
+        'CRC-16/MODBUS':        (16, 0x8005, 0xFFFF, True, True, 0x0000, 0x4B37),
+        'CRC-16/T10-DIF':       (16, 0x8BB7, 0x0000, False, False, 0x0000, 0xD0DB),
+        'CRC-16/UMTS':          (16, 0x8005, 0x0000, False, False, 0x0000, 0xFEE8),
+        'CRC-16/USB':           (16, 0x8005, 0xFFFF, True, True, 0xFFFF, 0xB4C8),
+        'CRC-16/XMODEM':        (16, 0x1021, 0x0000, False, False, 0x0000, 0x31C3),
+        'CRC-32/AIXM':          (32, 0x814141AB, 0x00000000, False, False, 0x00000000, 0x3010BF7F),
+        'CRC-32/AUTOSAR':       (32, 0xF4ACFB13, 0xFFFFFFFF, True, True, 0xFFFFFFFF, 0x1697D06A),
+        'CRC-32/BASE91-D':      (32, 0xA833982B, 0xFFFFFFFF, True, True, 0xFFFFFFFF, 0x87315576),
+        'CRC-32/BZIP2':         (32, 0x04C11DB7, 0xFFFFFFFF, False, False, 0xFFFFFFFF, 0xFC891918),
+        'CRC-32/CKSUM':         (32, 0x04C11DB7, 0x00000000, False, False, 0xFFFFFFFF, 0x765E7680),
+        'CRC-32/ISCSI':         (32, 0x1EDC6F41, 0xFFFFFFFF, True, True, 0xFFFFFFFF, 0xE3069283),
+        'CRC-32/ISO-HDLC':      (32, 0x04C11DB7, 0xFFFFFFFF, True, True, 0xFFFFFFFF, 0xCBF43926),
+        'CRC-32/JAMCRC':        (32, 0x04C11DB7, 0xFFFFFFFF, True, True, 0x00000000, 0x340BC6D9),
+        'CRC-32/MPEG-2':        (32, 0x04C11DB7, 0xFFFFFFFF, False, False, 0x00000000, 0x0376E6E7),
+        'CRC-32/XFER':          (32, 0x000000AF, 0x00000000, False, False, 0x00000000, 0xBD0BE338),
+        'CRC-64/ECMA-182':      (64, 0x42F0E1EBA9EA3693, 0x0000000000000000, False, False,
+                                 0x0000000000000000, 0x6C40DF5F0B497347),
+        'CRC-64/GO-ISO':        (64, 0x000000000000001B, 0xFFFFFFFFFFFFFFFF, True, True,
+                                 0xFFFFFFFFFFFFFFFF, 0xB90956C775A41001),
+        'CRC-64/MS':            (64, 0x259C84CBA6426349, 0xFFFFFFFFFFFFFFFF, True, True,
+                                 0x0000000000000000, 0x75D4B74F024ECEEA),
+        'CRC-64/REDIS':         (64, 0xAD93D23594C935A9, 0x0000000000000000, True, True,
+                                 0x0000000000000000, 0xE9C6D914C4B8D9CA),
+        'CRC-64/WE':            (64, 0x42F0E1EBA9EA3693, 0xFFFFFFFFFFFFFFFF, False, False,
+                                 0xFFFFFFFFFFFFFFFF, 0x62EC59E3F1A4F00A),
+        'CRC-64/XZ':            (64, 0x42F0E1EBA9EA3693, 0xFFFFFFFFFFFFFFFF, True, True,
+                                 0xFFFFFFFFFFFFFFFF, 0x995DC9BBDF1939FA),
+    }
+    catalogue['CRC-8'] = catalogue['CRC-8/SMBUS']
+    catalogue['CRC-16'] = catalogue['CRC-16/ARC']
+    catalogue['CRC-32'] = catalogue['CRC-32/ISO-HDLC']
+    catalogue['CRC-32C'] = catalogue['CRC-32/ISCSI']
+    catalogue['CRC-64'] = catalogue['CRC-64/ECMA-182']
+
+    def __init__(self, poly, width=None, init=0, refin=False, refout=None,
+                 xorout=0, nslices=8):
+        """
+        Create a CRC.
+
+        Arguments:
+            poly - anything blis accepts, without the x^width term
+            width - number of bits in the CRC, defaults to poly.nbits
+            init - initial register value
+            refin - if input bytes are reflected (LSB first)
+            refout - if the output is reflected, defaults to refin
+            xorout - XOR:ed with the register to give the digest
+            nslices - number of bytes per lookup step, 1, 4 or 8
+        """
+        if nslices not in (1, 4, 8):
+            raise ValueError(f'Expected nslices to be 1, 4 or 8, not {nslices}.')
+
+        self.poly = blis(poly) if width is None else blis(poly, width)
+        self.order = self.poly.nbits
+        self.init = init
+        self.refin = refin
+        self.refout = refin if refout is None else refout
+        self.xorout = xorout
+        self.nslices = nslices
+
+        self._poly = self.poly._value
+        self._tables = _crctables(self._poly, self.order, refin, nslices)
+        # the normal register is shifted up to a whole number of bytes
+        self._shift = 0 if refin else -self.order % 8
+        if refin:
+            self._update = partial(_crc_reflected, tables=self._tables)
+        else:
+            self._update = partial(_crc_normal, tables=self._tables,
+                                   nbits=self.order + self._shift)
+        self._update = self._fastupdate() or self._update
+        self.reset()
+
+        self.poly.append(1)
+
+    @classmethod
+    def named(cls, name, **kwargs):
+        """Create a CRC from the catalogue, e.g. CRC.named('CRC-32/ISCSI')."""
+        width, poly, init, refin, refout, xorout, _ = cls.catalogue[name]
+        return cls(poly, width, init=init, refin=refin, refout=refout,
+                   xorout=xorout, **kwargs)
+
+    def _fastupdate(self):
+        """Return a C implementation of the register update, if there is one."""
+        if self.refin and (self.order, self._poly) == (32, 0x04C11DB7):
+            # zlib inverts the register before and after
+            return lambda reg, data: zlib.crc32(data, reg ^ 0xFFFFFFFF) ^ 0xFFFFFFFF
+        if not self.refin and (self.order, self._poly) == (16, 0x1021):
+            return lambda reg, data: binascii.crc_hqx(data, reg)
+        return None
+
+    #
+    # INCREMENTAL
+    #
+
+    def reset(self):
+        """Start over with the register at init."""
+        if self.refin:
+            self._reg = reflect(self.init, self.order)
+        else:
+            self._reg = self.init << self._shift
+        self.nbytes = 0
+        return self
+
+    def digest(self):
+        """Return the CRC of everything fed to update so far."""
+        reg = self._reg >> self._shift
+        if self.refin != self.refout:
+            reg = reflect(reg, self.order)
+        return reg ^ self.xorout
+
+    def hexdigest(self):
+        return format(self.digest(), f'0{-(-self.order // 4)}x')
+
+    def copy(self):
+        other = copy(self)
+        other.poly = blis(self.poly)
+        return other
+
+    #
+    # POLYNOMIAL DIVISION
+    #
+
+    def write(self, x):
+        """
+        Return the remainder of x * 2**order divided by poly.
+
+        This is the plain CRC of the bits in x, MSB first, i.e. without init,
+        reflection or xorout. x is anything blis accepts, a bytes-like object
+        or a binary file object.
+        """
+        shift = -self.order % 8
+        tables = _crctables(self._poly, self.order, False, self.nslices)
+        update = partial(_crc_normal, tables=tables, nbits=self.order + shift)
+        nbytes = self.nbytes # write is not part of the incremental CRC
+
+        if hasattr(x, 'read') and not _isbuffer(x):
+            reg = self._readfrom(0, x, update)
+            self.nbytes = nbytes
+            return blis(reg >> shift, self.order)
+        if not isiterable(x) or isinstance(x, (bytes, bytearray, memoryview, mmap.mmap)):
+            try:
+                reg = self._feed(0, x, update)
+            except TypeError:
+                pass # not bytes-like, let blis try
+            else:
+                self.nbytes = nbytes
+                return blis(reg >> shift, self.order)
+
+        x = blis(x)
+
+        if x.nbits < self.poly.nbits:
+            raise TypeError('x cannot have less number of bits than poly.')
+
+        # the first bits until a whole number of bytes are left, one at a time
+        n = x.nbits % 8
+        top, mask = 1 << (self.order - 1), (1 << self.order) - 1
+        reg = 0
+        for i in reversed(range(x.nbits - n, x.nbits)):
+            bit = x._value >> i & 1
+            reg = (reg << 1) & mask ^ (self._poly if bool(reg & top) != bit else 0)
+
+        # then the rest through the tables
+        data = (x._value & ((1 << (x.nbits - n)) - 1)).to_bytes((x.nbits - n) // 8, 'big')
+        reg = update(reg << shift, data) >> shift
+
+        return blis(reg, self.order)
+
+
+#
+# FLETCHER
+#
+
+def _fletcher_sums(s1, s2, data, fmt, modulus, block):
+    """Add the words of data to the running sums, reducing once per block."""
+    size = struct.calcsize(fmt[1])
+    for i in range(0, len(data), block * size):
+        n = min(block, (len(data) - i) // size)
+        words = struct.unpack_from(f'{fmt[0]}{n}{fmt[1]}', data, i)
+        s2 = (s2 + n * s1 + sum(accumulate(words))) % modulus
+        s1 = (s1 + sum(words)) % modulus
+    return s1, s2
+
+def _fletcher_sums_np(s1, s2, data, fmt, modulus, block, rowsize=1024):
+    """
+    As _fletcher_sums, vectorized.
+
+    The words are laid out in rows of rowsize. Each word counts to s2 once
+    for every word from it to the end, so a row adds its weighted sum plus
+    its plain sum times the number of words in the rows below. The weighted
+    sums are one matrix-vector product, exact in float64 for words of up to
+    32 bits.
+    """
+    words = np.frombuffer(data, dtype=fmt[0] + 'u' + str(struct.calcsize(fmt[1])))
+    weights = np.arange(rowsize, 0, -1, dtype=np.float64)
+    for i in range(0, len(words), block):
+        w = words[i:i + block]
+        n = len(w) - len(w) % rowsize
+        if n:
+            rows = w[:n].reshape(-1, rowsize).astype(np.float64)
+            inner = (rows @ weights).astype(np.int64)
+            sums = rows.sum(axis=1).astype(np.int64)
+            below = np.arange(len(sums) - 1, -1, -1, dtype=np.int64)
+            s2 = (s2 + n * s1 + int(inner.sum())
+                  + rowsize * int((sums * below).sum())) % modulus
+            s1 = (s1 + int(sums.sum())) % modulus
+        if n < len(w):
+            c = np.cumsum(w[n:], dtype=np.uint64)
+            s2 = (s2 + len(c) * s1 + int(c.sum(dtype=np.uint64))) % modulus
+            s1 = (s1 + int(c[-1])) % modulus
+    return s1, s2
+
+class Fletcher(Checksum):
+    """
+    Fletcher's checksum of order 16, 32 or 64.
+
+    The data is summed as words of order/16 bytes, in byteorder, modulo
+    2**(order/2) - 1. A last odd word is padded with zero bytes.
+
+    >> Fletcher(32).update(b'abcde').hexdigest()
+    'f04fc729'
+
+    The modulo is taken once per block of words rather than once per word.
+    With numpy each block is summed with one matrix-vector product, see
+    _fletcher_sums_np, otherwise with itertools.accumulate.
+    """
+
+    def __init__(self, order=16, byteorder='little'):
+        if order not in (16, 32, 64):
+            raise ValueError(f'Expected order to be 16, 32 or 64, not {order}.')
+        if byteorder not in ('little', 'big'):
+            raise ValueError(f"Expected byteorder to be 'little' or 'big', not {byteorder!r}.")
+        self.order = order
+        self.byteorder = byteorder
+        self.modulus = (1 << order // 2) - 1
+        self._init = (0, 0)
+        self._setup(order // 16)
+        self._update = self._fletcherupdate
+        self.reset()
+
+    def _setup(self, wordsize):
+        self.wordsize = wordsize
+        self._fmt = ('<' if self.byteorder == 'little' else '>') \
+            + {1: 'B', 2: 'H', 4: 'I'}[wordsize]
+        # the sums of a block fit in 64 bits, n*n/2 * 2**wordbits < 2**64
+        self._block = 1 << min(20, (64 - 8 * wordsize) // 2)
+
+    def _sums(self, s1, s2, data):
+        sums = _fletcher_sums if np is None else _fletcher_sums_np
+        return sums(s1, s2, data, self._fmt, self.modulus, self._block)
+
+    def _fletcherupdate(self, reg, data):
+        # reg is (s1, s2, bytes of an unfinished word)
+        s1, s2, tail = reg
+        if tail:
+            need = self.wordsize - len(tail)
+            tail, data = tail + bytes(data[:need]), data[need:]
+            if len(tail) < self.wordsize:
+                return s1, s2, tail
+            s1, s2 = self._sums(s1, s2, tail)
+        n = len(data) - len(data) % self.wordsize
+        if n:
+            s1, s2 = self._sums(s1, s2, data[:n])
+        return s1, s2, bytes(data[n:])
+
+    def reset(self):
+        """Start over with empty sums."""
+        self._reg = self._init + (b'',)
+        self.nbytes = 0
+        return self
+
+    def digest(self):
+        """Return the checksum of everything fed to update so far."""
+        s1, s2, tail = self._reg
+        if tail:
+            s1, s2 = self._sums(s1, s2, tail.ljust(self.wordsize, b'\0'))
+        return s2 << self.order // 2 | s1
+
+    def hexdigest(self):
+        return format(self.digest(), f'0{self.order // 4}x')
+
+    def copy(self):
+        return copy(self)
+
+
+class Adler32(Fletcher):
+    """
+    Adler-32, as in zlib.
+
+    Fletcher's sums over bytes modulo 65521, with the first sum starting at
+    1. Computed with zlib.adler32.
+
+    >> Adler32().update(b'Wikipedia').hexdigest()
+    '11e60398'
+    """
+
+    def __init__(self):
+        self.order = 32
+        self.byteorder = 'little'
+        self.modulus = 65521
+        self._init = (1, 0)
+        self._setup(1)
+        self._update = self._zlibupdate
+        self.reset()
+
+    def _zlibupdate(self, reg, data):
+        s1, s2, _ = reg
+        value = zlib.adler32(data, s2 << 16 | s1)
+        return value & 0xFFFF, value >> 16, b''
+
+
+def main(argv=None):
+    """
+    Print the CRC or checksum of files and the rate they were read at.
+
+    $ python binary.py -c CRC-32C capture1.bin capture2.bin
+    """
+    from argparse import ArgumentParser
+
+    checksums = {name: partial(CRC.named, name) for name in CRC.catalogue}
+    checksums.update({'Fletcher-16': partial(Fletcher, 16),
+                      'Fletcher-32': partial(Fletcher, 32),
+                      'Fletcher-64': partial(Fletcher, 64),
+                      'Adler-32': Adler32})
+
+    parser = ArgumentParser(description='Checksum files with a CRC.')
+    parser.add_argument('files', nargs='+', metavar='FILE',
+                        help="file to checksum, '-' for stdin")
+    parser.add_argument('-c', '--crc', default='CRC-32', metavar='NAME',
+                        choices=sorted(checksums),
+                        help='a CRC from the catalogue, Fletcher-16/32/64 or '
+                             'Adler-32 (default: CRC-32)')
+    parser.add_argument('--no-mmap', dest='usemmap', action='store_false',
+                        help='read files into a buffer instead of mmap')
+    args = parser.parse_args(argv)
+
+    status, nbytes, started = 0, 0, time()
+    for path in args.files:
+        crc = checksums[args.crc]()
+        t = time()
+        try:
+            if path == '-':
+                crc.update(sys.stdin.buffer)
+            else:
+                crc.updatefile(path, args.usemmap)
+        except OSError as e:
+            print(f'{path}: {e.strerror}', file=sys.stderr)
+            status = 1
+            continue
+        nbytes += crc.nbytes
+        rate = crc.nbytes / 1e6 / max(time() - t, 1e-9)
+        print(f'{crc.hexdigest()}  {rate:10.1f} MB/s  {path}')
+
+    if len(args.files) > 1:
+        rate = nbytes / 1e6 / max(time() - started, 1e-9)
+        print(f'{"total":{-(-crc.order // 4)}}  {rate:10.1f} MB/s  {nbytes} bytes')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#! /usr/bin/env python3
+
+"""
+Time the arithmetic of blis against plain ints, for widths 8 to 1M bits.
+
+$ python binary_bench.py
+$ python binary_bench.py --widths 64 4096 --ops mul pow
+"""
+
+import operator
+import random
+from timeit import Timer
+
+from binary import blis
+
+
+ops = {
+    'add': operator.add,
+    'mul': operator.mul,
+    'floordiv': operator.floordiv,
+    'mod': operator.mod,
+    # e = 65537 as for RSA, the modulus is the second operand
+    'pow': lambda a, b: pow(a, 65537, b),
+}
+
+def timeop(op, a, b, budget):
+    """Return the seconds per call of op(a, b), timed for about budget s."""
+    timer = Timer(lambda: op(a, b))
+    n, t = 1, timer.timeit(1)
+    if t < budget:
+        n = max(1, int(budget / max(t, 1e-9)))
+        t = timer.timeit(n)
+    return t / n
+
+def main(argv=None):
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description='Time blis arithmetic against int.')
+    parser.add_argument('--widths', nargs='+', type=int, metavar='NBITS',
+                        default=[8, 64, 512, 4096, 32768, 262144, 1 << 20])
+    parser.add_argument('--ops', nargs='+', choices=list(ops), default=list(ops))
+    parser.add_argument('--budget', type=float, default=0.2,
+                        help='seconds to time each case for (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    random.seed(0)
+    print(f'{"op":>8} {"nbits":>8} {"blis":>12} {"int":>12} {"ratio":>6}')
+    for name in args.ops:
+        for nbits in args.widths:
+            # x fills nbits, y half of it so that // and % have work to do
+            half = max(nbits // 2, 2)
+            x = random.getrandbits(nbits - 1) | 1 << (nbits - 2) | 1
+            y = random.getrandbits(half - 1) | 1 << (half - 2) | 1
+            a, b = blis(x, nbits), blis(y, nbits)
+            tblis = timeop(ops[name], a, b, args.budget)
+            tint = timeop(ops[name], x, y, args.budget)
+            print(f'{name:>8} {nbits:>8} {tblis * 1e6:10.2f}us {tint * 1e6:10.2f}us '
+                  f'{tblis / tint:6.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,16 @@
 #! /usr/bin/env python3
 
-from unittest import TestCase, TestSuite,  main
+from unittest import TestCase, main, skipIf
+from tempfile import NamedTemporaryFile
+import io
+import mmap
 
-from binary import blis
+from binary import (blis, blisview, frozenblis, bitarray, fixedtype, fixedarray,
+                    u8, u16, u32, u64, i8, i16, i64, BitLayout, BinT, CRC, Hamming,
+                    Fletcher, Adler32, np)
+import binary
+import zlib
+from binary import ispower2, ceilpow2, floorpow2, ispower2Many, ceilpow2Many, floorpow2Many
 import operator
 
 
@@ -38,11 +46,13 @@ def operator_test(self):
             right = cr(ropand)
 
             est = self.op(left, right)
+            # as for int, a negative exponent gives a float
+            est = est if isinstance(est, float) else int(est)
 
             with self.subTest():
-                self.assertEqual(int(est), ans, errmsg)
+                self.assertEqual(est, ans, errmsg)
             
-            print(errmsg, 'complete!', f'ans: {ans}', f'est: {int(est)}')
+            print(errmsg, 'complete!', f'ans: {ans}', f'est: {est}')
 
 
 class BLIS_ADD(TestCase):
@@ -77,6 +87,610 @@ class BLIS_POW(TestCase):
         self.op = operator.pow
         operator_test(self)
 
+class BLIS_BITS(TestCase):
+    def test(self):
+        x = blis(13, 6)
+        self.assertEqual(x.bits, [1, 0, 1, 1, 0, 0])
+        self.assertEqual(str(x), '001101')
+        self.assertEqual(list(x[1:4]), [0, 1, 1])
+        x[1] = 1
+        x[4:6] = [1, 1]
+        self.assertEqual(int(x), -1)
+        del x[0]
+        x.insert(0, 0)
+        self.assertEqual(str(x), '111110')
+
+    def test_wide(self):
+        n = 1 << 14
+        x = blis(0, n)
+        x[n - 2] = 1
+        self.assertEqual(int(x), 1 << (n - 2))
+        self.assertEqual(int(~x ^ x), -1)
+        self.assertEqual(int(-x), -(1 << (n - 2)))
+
+class BLIS_INPLACE(TestCase):
+    def test(self):
+        ops = [(operator.and_, operator.iand), (operator.or_, operator.ior),
+               (operator.xor, operator.ixor), (operator.add, operator.iadd),
+               (operator.lshift, operator.ilshift), (operator.rshift, operator.irshift)]
+        for op, iop in ops:
+            for other in (3, -7, blis(0b101, 3), blis(0b1100110011, 10)):
+                x = blis(0b10110110, 8)
+                with self.subTest(op=op.__name__, other=other):
+                    ans = op(x, other)
+                    y = iop(x, other)
+                    self.assertIs(y, x)
+                    self.assertEqual((str(y), int(y)), (str(ans), int(ans)))
+
+    def test_copy(self):
+        x = blis(0b1011, 4)
+        y = x.copy()
+        y[0] = 0
+        self.assertEqual(str(x), '1011')
+        self.assertEqual(str(y), '1010')
+        self.assertIsNot(+x, x)
+        self.assertEqual(str(-x), '0101')
+        self.assertEqual(str(~x), '0100')
+
+class BLIS_COMPARE(TestCase):
+    def test(self):
+        values = [-300, -129, -128, -1, 0, 1, 5, 127, 128, 300]
+        xs = [blis(v, 10) for v in values]
+        for v, x in zip(values, xs):
+            for w in values:
+                with self.subTest(x=v, other=w):
+                    for other in (w, blis(w)):
+                        self.assertEqual(x == other, v == w)
+                        self.assertEqual(x < other, v < w)
+                        self.assertEqual(x <= other, v <= w)
+                        self.assertEqual(x > other, v > w)
+                        self.assertEqual(x >= other, v >= w)
+        self.assertEqual(sorted(reversed(xs)), xs)
+        self.assertTrue(blis(1, 2) == True)
+        self.assertEqual(operator.index(blis(-2, 4)), -2)
+
+class FROZEN_BLIS(TestCase):
+    def test(self):
+        table = {frozenblis('0110'): 'load', frozenblis('00110'): 'store'}
+        self.assertEqual(table[frozenblis(blis(6, 4))], 'load')
+        self.assertEqual(table[frozenblis(6, 5)], 'store')
+        self.assertEqual(len({frozenblis(6, 4), frozenblis('0110'), frozenblis(6, 8)}), 2)
+        x = frozenblis(6, 4)
+        self.assertTrue(x == frozenblis('0110') and x != frozenblis(6, 8))
+        # the width is part of the key, so never equal to what hashes apart
+        self.assertTrue(x != 6 and 6 != x and x != blis(6, 4) and blis(6, 4) != x)
+        self.assertNotIn(6, {x})
+        self.assertEqual(int(x), 6)
+        for change in (lambda: x.__setitem__(0, 1), lambda: x.append(1),
+                       lambda: x.invert(), lambda: x.pop()):
+            self.assertRaises(TypeError, change)
+        self.assertRaises(AttributeError, setattr, x, 'nbits', 3)
+        y = x
+        y ^= 3
+        self.assertEqual((str(x), str(y)), ('0110', '00000101'))
+
+    def test_intern(self):
+        self.assertIs(frozenblis.intern(6, 4), frozenblis.intern('0110'))
+        self.assertIsNot(frozenblis.intern(6, 4), frozenblis.intern(6, 5))
+
+class BITARRAY(TestCase):
+    def test(self):
+        b = bitarray(1000)
+        b.fill(10, 500)
+        b.set(600)
+        b.clear(20)
+        self.assertEqual(b.popcount(), 490)
+        self.assertEqual((b.find_first_zero(), b.find_first_zero(10)), (0, 20))
+        self.assertEqual((b.find_first_one(), b.find_first_one(500)), (10, 600))
+        self.assertEqual(bitarray(64, 1).find_first_zero(), -1)
+        self.assertEqual(int(b), ((1 << 500) - (1 << 10)) ^ (1 << 20) | (1 << 600))
+        self.assertEqual(b.to_blis().popcount(), 490)
+        self.assertEqual(bitarray.from_blis(blis('1011')).find_first_zero(), 2)
+        self.assertRaises(IndexError, b.set, 1000)
+
+    def test_ops(self):
+        a = bitarray.from_int(0b1100 << 60, 70)
+        b = bitarray.from_int(0b1010 << 60, 70)
+        self.assertEqual(int(a & b), 0b1000 << 60)
+        self.assertEqual(int(a | b), 0b1110 << 60)
+        self.assertEqual(int(a ^ b), 0b0110 << 60)
+        self.assertEqual(int(~a), ((1 << 70) - 1) ^ (0b1100 << 60))
+        a ^= a
+        self.assertEqual(a.popcount(), 0)
+        self.assertRaises(ValueError, a.__ior__, bitarray(69))
+
+    def test_slice(self):
+        b = bitarray(100)
+        b[3:70] = blis(-1, 67)
+        b[10:12] = [0, 1]
+        self.assertEqual(str(b[0:14]), '11101111111000')
+        self.assertEqual(b.popcount(), 66)
+        self.assertEqual(str(b[0:8:2]), '1100')
+        self.assertRaises(ValueError, b.__setitem__, slice(0, 4), [1, 1])
+        b &= blis(0, 100)
+        self.assertEqual(b.popcount(), 0)
+
+    def test_open(self):
+        with NamedTemporaryFile() as f:
+            with bitarray.open(f.name, 1000) as b:
+                b[4:68] = blis(-1, 64)
+                b.set(999)
+            with bitarray.open(f.name, readonly=True) as b:
+                self.assertEqual(len(b), 1024)
+                self.assertEqual(b.popcount(), 65)
+                self.assertEqual((b.find_first_one(), b.find_first_zero(4)), (4, 68))
+                self.assertRaises(TypeError, b.set, 0)
+
+    def test_open_padding(self):
+        # the bits past nbits are the file's, neither read nor written
+        with NamedTemporaryFile() as f:
+            f.write(b'\xff' * 16)
+            f.flush()
+            for numpy in (np, None):
+                binary.np = numpy
+                try:
+                    with self.subTest(numpy=numpy is not None):
+                        with bitarray.open(f.name, 10, readonly=True) as b:
+                            self.assertEqual(b.popcount(), 10)
+                            self.assertEqual(int(b), 1023)
+                            self.assertEqual(b.to_blis()._value, 1023)
+                            self.assertEqual(b, bitarray(10, 1))
+                            self.assertEqual((~b).popcount(), 0)
+                            self.assertEqual(b.find_first_zero(), -1)
+                        with bitarray.open(f.name, 70) as b:
+                            b &= bitarray(70)
+                            b.fill(0, 70)
+                            self.assertEqual(b.popcount(), 70)
+                            b[0:70] = blis(0, 70)
+                            self.assertEqual(b.popcount(), 0)
+                        f.seek(0)
+                        self.assertEqual(f.read(), b'\0' * 8 + b'\xc0' + b'\xff' * 7)
+                        with open(f.name, 'r+b') as g:
+                            g.write(b'\xff' * 16)
+                finally:
+                    binary.np = np
+
+    @skipIf(np is None, 'requires numpy')
+    def test_many(self):
+        b = bitarray(10000)
+        idx = np.array([3, 3, 64, 9999, 5000])
+        b.setMany(idx)
+        self.assertEqual(b.popcount(), 4)
+        self.assertTrue(b.testMany(idx).all())
+        b.clearMany(idx[:2])
+        self.assertEqual(b.testMany(idx).tolist(), [False, False, True, True, True])
+        words = BinT(64).highAtMany(b.words(), 0)
+        self.assertEqual(words.size, 157)
+
+class BLIS_STRING(TestCase):
+    def test_parse(self):
+        for string, bits in [('1011', '1011'), ('0b10_11', '1011'), ('0B1011', '1011'),
+                             ('0x00ff', '0000000011111111'), ('0xF_F', '11111111'),
+                             ('0o17', '001111')]:
+            with self.subTest(string=string):
+                self.assertEqual(str(blis(string)), bits)
+        self.assertEqual(str(blis('0x1ff', 12)), '000111111111')
+        for string in ('', '0x', '12', '-101', ' 101', '0xg'):
+            self.assertRaises(ValueError, blis, string)
+
+    def test_format(self):
+        x = blis(-2, 20)
+        self.assertEqual(f'{x}', str(x))
+        self.assertEqual(f'{x:x}', 'ffffe')
+        self.assertEqual(f'{x:#_x}', '0xf_fffe')
+        self.assertEqual(f'{x:o}', '3777776')
+        self.assertEqual(f'{blis(5, 6):#b}', '0b000101')
+        self.assertEqual(f'{x:d}', '-2')
+        self.assertEqual(str(blis(format(x, '#x'))), str(x))
+
+class FIXED_INT(TestCase):
+    def test_wrap(self):
+        self.assertEqual(repr(u8(250) + 10), 'u8(4)')
+        self.assertEqual(1 - u8(2), 255)
+        self.assertEqual(i8(127) + 1, -128)
+        self.assertEqual(-i8(-128), -128)
+        self.assertEqual(i8(-128) // -1, -128)
+        self.assertEqual(u8(3) ** 6, 729 % 256)
+        self.assertEqual(~u8(0), 255)
+        self.assertEqual(i8(-64) >> 2, -16)
+        self.assertEqual(u8(300), 44)
+
+    def test_saturate(self):
+        s8, su8 = fixedtype(8, True, True), fixedtype(8, saturating=True)
+        self.assertEqual(repr(su8(250) + 10), 'u8sat(255)')
+        self.assertEqual(su8(5) - 10, 0)
+        self.assertEqual(s8(100) * 2, 127)
+        self.assertEqual(-s8(-128), 127)
+        self.assertEqual(s8(-3) ** 101, -128)
+        self.assertEqual(s8(64) << 1, -128) # shifts wrap
+
+    def test_bits(self):
+        self.assertEqual(u8(0x12).rotl(4), 0x21)
+        self.assertEqual(u32(0x80000001).rotl(1), 3)
+        self.assertEqual(i8(-2).rotr(1), 127)
+        self.assertEqual(u32(0x12345678).byteswap(), 0x78563412)
+        self.assertEqual(i16(0x0080).byteswap(), -0x8000)
+        self.assertEqual(str(i8(-3).to_blis()), '11111101')
+        self.assertIs(fixedtype(8), u8)
+        self.assertEqual({u8(5): 1}[5], 1)
+
+    def test_compare(self):
+        # reals compare by value, as they do with int
+        self.assertTrue(u8(3) < 4.5 and 4.5 > u8(3) and i8(-1) >= -1.0)
+        self.assertTrue(u8(1) == 1.0 and u8(1) != 1.5 and 1.0 in {u8(1)})
+        self.assertFalse(u8(200) <= float('-inf'))
+        self.assertNotEqual(u8(1), '1')
+        self.assertRaises(TypeError, operator.lt, u8(1), '1')
+
+    def test_array(self):
+        for t in (u8, i8, u16, i16, u32, fixedtype(12, True), fixedtype(8, True, True)):
+            values = list(range(t.min, t.max + 1, max(1, (t.max - t.min) // 97)))
+            a = fixedarray(t, values)
+            b = fixedarray(t, reversed(values))
+            with self.subTest(type=t.__name__):
+                for op in (operator.add, operator.sub, operator.mul, operator.xor):
+                    self.assertEqual(op(a, b).tolist(), [op(t(x), y) for x, y in zip(a, b)])
+                    self.assertEqual(op(a, 100).tolist(), [op(t(x), 100) for x in a])
+                    self.assertEqual(op(100, a).tolist(), [op(100, t(x)) for x in a])
+                self.assertEqual(a.rotl(3).tolist(), [t(x).rotl(3) for x in a])
+                if t.nbits % 8 == 0:
+                    self.assertEqual(a.byteswap().tolist(), [t(x).byteswap() for x in a])
+        a = fixedarray(u8, [1, 2])
+        a += 255
+        a.append(300)
+        self.assertEqual(a.tolist(), [0, 1, 44])
+
+    def test_array_mixed(self):
+        # the right operand wraps to the type of the left, as for fixedint
+        for t, s in ((u64, i64), (i64, u64), (u8, i8), (i16, u8), (u8, u32)):
+            a = fixedarray(t, [t.max, t.min, 5])
+            b = fixedarray(s, [s.min, s.max, 3])
+            with self.subTest(left=t.__name__, right=s.__name__):
+                for op in (operator.add, operator.sub, operator.mul, operator.xor):
+                    self.assertEqual(op(a, b).tolist(), [op(t(x), y) for x, y in zip(a, b)])
+        a, b = fixedarray(u64, [2**64 - 1, 5]), fixedarray(i64, [-1, 3])
+        self.assertEqual((a + b).tolist(), [2**64 - 2, 8])
+
+class BIT_LAYOUT(TestCase):
+    ctrl = BitLayout(('mode', 0, 3), ('enable', 3, 1), ('offset', 4, 12, True))
+
+    def test(self):
+        word = self.ctrl.pack(mode=5, enable=1, offset=-2)
+        self.assertEqual(word, 0xFFED)
+        self.assertEqual(self.ctrl.unpack(word), {'mode': 5, 'enable': 1, 'offset': -2})
+        self.assertEqual(self.ctrl.get(word, 'offset'), -2)
+        self.assertEqual(self.ctrl.set(word, offset=5, mode=0), 0x58)
+        self.assertRaises(ValueError, self.ctrl.pack, offset=2048)
+        self.assertRaises(ValueError, self.ctrl.pack, mode=-1)
+        self.assertRaises(TypeError, self.ctrl.pack, foo=1)
+        self.assertRaises(ValueError, BitLayout, ('a', 0, 4), ('b', 3, 2))
+
+    @skipIf(np is None, 'requires numpy')
+    def test_many(self):
+        layout = BitLayout(('a', 0, 1), ('b', 1, 7, True), ('c', 8, 20), ('d', 28, 36, True))
+        words = np.arange(1000, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        columns = layout.unpackMany(words)
+        self.assertEqual([c.dtype.str[1:] for c in columns.values()], ['u1', 'i1', 'u4', 'i8'])
+        for i in range(0, 1000, 37):
+            ans = layout.unpack(int(words[i]))
+            self.assertEqual({name: int(c[i]) for name, c in columns.items()}, ans)
+        self.assertTrue((layout.packMany(**columns) == words).all())
+        rows = layout.unpackStructured(words.view(np.int64))
+        self.assertEqual(rows['d'].tolist(), columns['d'].tolist())
+
+class BLIS_ARITH(TestCase):
+    def test_width(self):
+        x = blis(127, 8) + 1
+        self.assertEqual((int(x), x.nbits), (128, 9))
+        self.assertEqual(int(-blis(-128, 8)), 128)
+        self.assertEqual((blis(100, 64) * 3).nbits, 64)
+        self.assertEqual((blis(-100, 64) - blis(1 << 70)).nbits, 72)
+        self.assertEqual(int(blis(7) / 2), 3)
+
+    def test_pow(self):
+        x = pow(blis(3, 16), 5, 7)
+        self.assertEqual((int(x), x.nbits), (5, 8))
+        self.assertEqual(int(pow(blis(3), -1, 7)), 5)
+        self.assertEqual(int(2 ** blis(10, 8)), 1024)
+        m = (1 << 521) - 1
+        self.assertEqual(int(pow(blis(12345, 600), blis(m - 2, 600), blis(m, 600))),
+                         pow(12345, m - 2, m))
+
+class BLIS_VIEW(TestCase):
+    def test(self):
+        x = blis('0x12345678')
+        v = x[4:20]
+        self.assertIsInstance(v, blisview)
+        self.assertIs(v[4:8]._base, x._value)
+        self.assertEqual(str(v[4:8]), '0110')
+        self.assertEqual(int(v[0]), 1)
+        self.assertEqual(hex(v._value), '0x4567')
+
+    def test_copy_on_write(self):
+        x = blis(0, 16)
+        v = x[0:8]
+        x[0] = 1
+        self.assertEqual(str(v), '00000000')
+        v[1] = 1
+        self.assertEqual((str(v), str(x)), ('00000010', '0000000000000001'))
+        v = x[0:4]
+        v.nbits = 8
+        self.assertEqual(str(v), '00000001')
+        self.assertIs(type(v.copy()), blis)
+
+    def test_shift(self):
+        x = blis('0x1234')
+        self.assertEqual(str(x >> 4), '0100')
+        self.assertEqual(str(4 << x), '0001')
+        self.assertIsInstance(x >> 4, blisview)
+
+class CRC_CHECK(TestCase):
+    def test(self):
+        for name, (*_, check) in CRC.catalogue.items():
+            for nslices in (1, 4, 8):
+                with self.subTest(name=name, nslices=nslices):
+                    crc = CRC.named(name, nslices=nslices)
+                    self.assertEqual(crc.update(b'123456789').digest(), check)
+
+    def test_update(self):
+        data = bytes(range(256)) * 5
+        for name in ('CRC-8/ROHC', 'CRC-16/KERMIT', 'CRC-32/BZIP2', 'CRC-64/XZ'):
+            crc = CRC.named(name)
+            for i in range(0, len(data), 77):
+                crc.update(data[i:i+77])
+            self.assertEqual(crc.digest(), CRC.named(name).update(data).digest())
+
+    def test_stream(self):
+        data = bytes(range(256)) * 40
+        ans = CRC.named('CRC-32C').update(data).digest()
+        crc = CRC.named('CRC-32C')
+        crc.chunksize = 1000
+        self.assertEqual(crc.update(io.BytesIO(data)).digest(), ans)
+        self.assertEqual(crc.nbytes, len(data))
+        with NamedTemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            for usemmap in (True, False):
+                crc = CRC.named('CRC-32C').updatefile(f.name, usemmap)
+                self.assertEqual(crc.digest(), ans)
+            # an mmap is a buffer, not a file read from its position
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for _ in range(2):
+                    self.assertEqual(CRC.named('CRC-32C').update(mm).digest(), ans)
+                    self.assertEqual(Fletcher(32).update(mm).digest(),
+                                     Fletcher(32).update(data).digest())
+                self.assertEqual(mm.tell(), 0)
+                self.assertEqual(CRC([1, 1, 0]).write(mm), CRC([1, 1, 0]).write(data))
+
+    def test_write(self):
+        self.assertEqual(str(CRC([1, 1, 0]).write([1, 0, 1, 1, 0, 1, 1, 1])), '100')
+        # (x^4 + x^3) * x^4 mod (x^4 + x^3 + x^2) = x^3
+        self.assertEqual(str(CRC([0, 0, 1, 1]).write([0, 0, 0, 1, 1])), '1000')
+        crc = CRC(0x07, 8)
+        self.assertEqual(crc.write(b'\x81\x02'), crc.write(blis(0x8102, 16)))
+
+class FLETCHER_CHECK(TestCase):
+    checks = {
+        16: {b'abcde': 0xC8F0, b'abcdef': 0x2057, b'abcdefgh': 0x0627},
+        32: {b'abcde': 0xF04FC729, b'abcdef': 0x56502D2A, b'abcdefgh': 0xEBE19591},
+        64: {b'abcde': 0xC8C6C527646362C6, b'abcdef': 0xC8C72B276463C8C6,
+             b'abcdefgh': 0x312E2B28CCCAC8C6},
+    }
+
+    def test(self):
+        for order, checks in self.checks.items():
+            for data, check in checks.items():
+                with self.subTest(order=order, data=data):
+                    self.assertEqual(Fletcher(order).update(data).digest(), check)
+        self.assertEqual(Adler32().update(b'Wikipedia').digest(), 0x11E60398)
+
+    def test_update(self):
+        data = bytes(range(256)) * 5000 + b'\xff' * 5001
+        self.assertEqual(Adler32().update(data).digest(), zlib.adler32(data))
+        for order in (16, 32, 64):
+            for byteorder in ('little', 'big'):
+                ans = Fletcher(order, byteorder).update(data).digest()
+                f = Fletcher(order, byteorder)
+                for i in range(0, len(data), 7777):
+                    f.update(data[i:i+7777])
+                self.assertEqual(f.digest(), ans)
+                self.assertEqual(f.nbytes, len(data))
+                f = Fletcher(order, byteorder)
+                f.chunksize = 1001
+                self.assertEqual(f.update(io.BytesIO(data)).digest(), ans)
+
+    @skipIf(np is None, 'requires numpy')
+    def test_numpy(self):
+        data = bytes(range(256)) * 5000 + b'\xff' * 5001
+        for order in (16, 32, 64):
+            ans = Fletcher(order).update(data).digest()
+            binary.np = None
+            try:
+                self.assertEqual(Fletcher(order).update(data).digest(), ans)
+            finally:
+                binary.np = np
+
+class BINT_MASK(TestCase):
+    def test(self):
+        bint = BinT(8)
+        m = bint.mask(1, 3)
+        self.assertEqual(bint.moveAt(0b11111111, 0, m), 0b11110101)
+        self.assertEqual(bint.moveAt(0b11111111, 0, 1, 3), 0b11110101)
+        self.assertEqual(bint.notAt(0b1010, 1, 3, 3), 0b1000)
+        self.assertTrue(bint.isLowAt(0b0101, m))
+        self.assertIs(bint.mask(1, 3), m)
+        # a mask of another width is recompiled
+        self.assertEqual(BinT(4).lowAt(0b1111, m), 0b0101)
+
+    def test_cache(self):
+        # the cache is process wide, put back its size whatever happens
+        self.addCleanup(BinT.resizecache, BinT.cacheinfo().maxsize)
+        BinT.resizecache(2)
+        bint = BinT(8)
+        bint.highAt(0, 1)
+        bint.highAt(0, 1)
+        bint.highAt(0, 2)
+        bint.highAt(0, 3)
+        info = BinT.cacheinfo()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 3, 2))
+
+
+class BLIS_BYTES(TestCase):
+    def test(self):
+        x = blis.from_bytes(b'\x01\x80')
+        self.assertEqual((int(x), x.nbits), (384, 16))
+        self.assertEqual(int(blis.from_bytes(b'\x80', signed=True, nbits=12)), -128)
+        self.assertEqual(int(blis.from_bytes(b'\x80', nbits=12)), 128)
+        self.assertEqual(int(blis.from_bytes(memoryview(b'\x34\x12'), 'little')), 0x1234)
+        x = blis(-300, 12)
+        self.assertEqual(x.to_bytes(), b'\x0e\xd4')
+        self.assertEqual(x.to_bytes(3, signed=True), b'\xff\xfe\xd4')
+        self.assertEqual(bytes(x.view()), b'\xd4\x0e')
+        self.assertTrue(x.view().readonly)
+
+
+class POW2(TestCase):
+    def test(self):
+        for x in range(-2, 70):
+            with self.subTest(x=x):
+                pows = [i for i in range(8) if 2**i == x]
+                self.assertEqual(ispower2(x), pows[0] if pows else -1)
+                self.assertEqual(ceilpow2(x), min(i for i in range(8) if 2**i >= x))
+                self.assertEqual(floorpow2(x), max(i for i in range(8) if 2**i <= x) if x >= 1 else None)
+        self.assertEqual(floorpow2(1 << 5000), 5000)
+        self.assertEqual(ceilpow2((1 << 5000) + 1), 5001)
+        self.assertEqual(blis(1 << 100000).nbits, 100002)
+
+    @skipIf(np is None, 'requires numpy')
+    def test_many(self):
+        a = np.arange(-2, 5000)
+        self.assertEqual(ispower2Many(a).tolist(), [ispower2(int(x)) for x in a])
+        self.assertEqual(ceilpow2Many(a).tolist(), [ceilpow2(int(x)) for x in a])
+        self.assertEqual(floorpow2Many(a).tolist(), [-1 if x < 1 else floorpow2(int(x)) for x in a])
+
+
+class BIT_SCAN(TestCase):
+    def test(self):
+        bint = BinT(8)
+        self.assertTrue(bint.haseven(0b11))
+        self.assertFalse(bint.haseven(0b10))
+        self.assertEqual(bint.getWhereHigh(0b1011), (0, 1, 3))
+        self.assertEqual(bint.getWhereLow(0b11110100), (0, 1, 3))
+        for a in (0, 1, 0b1011000, 0b10000000, 0b11111111):
+            with self.subTest(a=a):
+                x = blis(a, 8)
+                high = [i for i in range(8) if a >> i & 1]
+                self.assertEqual(bint.popcount(a), len(high))
+                self.assertEqual(x.parity(), len(high) % 2)
+                self.assertEqual(list(x.iterhigh()), high)
+                self.assertEqual(bint.ffs(a), high[0] if high else -1)
+                self.assertEqual(x.fls(), high[-1] if high else -1)
+                self.assertEqual(x.ctz(), high[0] if high else 8)
+                self.assertEqual(bint.clz(a), 7 - high[-1] if high else 8)
+
+    @skipIf(np is None, 'requires numpy')
+    def test_many(self):
+        bint = BinT(16)
+        a = np.arange(0, 1 << 16, 3, dtype=np.uint16)
+        for name in ('popcount', 'parity', 'clz', 'ctz', 'ffs', 'fls', 'haseven'):
+            with self.subTest(name=name):
+                ans = [getattr(bint, name)(int(x)) for x in a]
+                self.assertEqual(getattr(bint, name + 'Many')(a).tolist(), ans)
+
+
+@skipIf(np is None, 'requires numpy')
+class BINT_MANY(TestCase):
+    def test(self):
+        a = np.arange(0, 1 << 16, 7, dtype=np.uint16)
+        b = a[::-1].copy()
+        for asup in (True, False):
+            bint = BinT(16, asup)
+            for il in [(), (0,), (1, 3, 15)]:
+                for name in ('andAt', 'nandAt', 'orAt', 'norAt', 'xorAt', 'xnorAt', 'moveAt'):
+                    with self.subTest(name=name, asup=asup, il=il):
+                        est = getattr(bint, name + 'Many')(a, b, *il)
+                        ans = [getattr(bint, name)(int(x), int(y), *il) for x, y in zip(a, b)]
+                        self.assertEqual(est.dtype, np.uint16)
+                        self.assertEqual(est.tolist(), ans)
+                for name in ('notAt', 'highAt', 'lowAt', 'isHighAt'):
+                    with self.subTest(name=name, asup=asup, il=il):
+                        est = getattr(bint, name + 'Many')(a, *il)
+                        ans = [getattr(bint, name)(int(x), *il) for x in a]
+                        self.assertEqual(est.tolist(), ans)
+
+class HAMMING(TestCase):
+    codes = [(7, 4), (8, 4, True), (15, 11), (72, 64, True)]
+
+    def test(self):
+        ham = Hamming(7, 4)
+        self.assertEqual(ham.encode(0b1011), 0b1010101)
+        self.assertEqual(ham.decode(0b1010001), (0b1011, Hamming.CORRECTED))
+        self.assertRaises(ValueError, Hamming, 9, 4)
+        for args in self.codes:
+            ham = Hamming(*args)
+            data = (0b1101 << (ham.k - 4)) | 0b1
+            word, check = ham.encode(data), ham.checkbits(data)
+            with self.subTest(code=ham):
+                self.assertEqual(ham.decode(word), (data, Hamming.OK))
+                for i in range(ham.n):
+                    self.assertEqual(ham.decode(word ^ 1 << i), (data, Hamming.CORRECTED))
+                for i in range(ham.k):
+                    self.assertEqual(ham.correct(data ^ 1 << i, check), (data, Hamming.CORRECTED))
+                if ham.extended:
+                    self.assertEqual(ham.decode(word ^ 0b101)[1], Hamming.UNCORRECTABLE)
+                    self.assertEqual(ham.correct(data ^ 0b1, check ^ 0b1)[1], Hamming.UNCORRECTABLE)
+
+    @skipIf(np is None, 'requires numpy')
+    def test_many(self):
+        for args in self.codes:
+            ham = Hamming(*args)
+            data = np.arange(0, 1 << ham.k, max(1, (1 << ham.k) // 1000), dtype=np.uint64)
+            errors = np.uint64(1) << (data % np.uint64(ham.k))
+            with self.subTest(code=ham):
+                check = ham.checkbitsMany(data)
+                self.assertEqual(check.tolist(), [ham.checkbits(int(x)) for x in data])
+                est, status = ham.correctMany(data ^ errors, check)
+                self.assertEqual(est.tolist(), data.tolist())
+                self.assertTrue((status == Hamming.CORRECTED).all())
+                if ham.n <= 64:
+                    words = ham.encodeMany(data)
+                    self.assertEqual(words.tolist(), [ham.encode(int(x)) for x in data])
+                    est, status = ham.decodeMany(words)
+                    self.assertEqual(est.tolist(), data.tolist())
+                    self.assertTrue((status == Hamming.OK).all())
+
+    @skipIf(np is None, 'requires numpy')
+    def test_many_input(self):
+        # lists and numpy's default int64 work as for decodeMany
+        ham = Hamming(7, 4)
+        for data in ([1, 2, 15], np.array([1, 2, 15])):
+            with self.subTest(data=type(data).__name__):
+                self.assertEqual(ham.encodeMany(data).tolist(), [ham.encode(x) for x in [1, 2, 15]])
+                self.assertEqual(ham.checkbitsMany(data).tolist(),
+                                 [ham.checkbits(x) for x in [1, 2, 15]])
+
+    @skipIf(np is None, 'requires numpy')
+    def test_many_double(self):
+        # two bit errors, which the batch must treat just like the scalar
+        for args in [(8, 4, True), (39, 32, True), (72, 64, True)]:
+            ham = Hamming(*args)
+            data = 0x5A5A5A5A5A5A5A5A & ((1 << ham.k) - 1)
+            check = ham.checkbits(data)
+            pairs = [(i, j) for i in range(ham.k) for j in range(i)]
+            errors = np.array([1 << i | 1 << j for i, j in pairs], dtype=np.uint64)
+            with self.subTest(code=ham):
+                est, status = ham.correctMany(np.uint64(data) ^ errors, check)
+                scalar = [ham.correct(data ^ int(e), check) for e in errors]
+                self.assertEqual(list(zip(est.tolist(), status.tolist())), scalar)
+                if ham.n <= 64:
+                    word = ham.encode(data)
+                    pairs = [(i, j) for i in range(ham.n) for j in range(i)]
+                    errors = np.array([1 << i | 1 << j for i, j in pairs], dtype=np.uint64)
+                    est, status = ham.decodeMany(np.uint64(word) ^ errors)
+                    scalar = [ham.decode(word ^ int(e)) for e in errors]
+                    self.assertEqual(list(zip(est.tolist(), status.tolist())), scalar)
+                    self.assertTrue((status == Hamming.UNCORRECTABLE).all())
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
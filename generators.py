@@ -5,9 +5,22 @@ from time import sleep
 from math import cos, inf, pi
 from functools import reduce
 from itertools import tee
+from collections import deque
+from collections.abc import Sequence
+from heapq import heapify, heappop, heapreplace
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from os import cpu_count
+from operator import length_hint
+from sys import maxsize
 
 from itertools import *
 
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:
+    np = None
+
 #
 # Sources
 #
@@ -70,32 +83,99 @@ def printer(it):
         print(elm)
         yield elm
 
-def expand(it, n):
+def expand(it, n, step=1, partial=False):
     """
-    Expand the first n values.
+    Expand the next n values, i.e. slide a window of n over it.
+
+    Use this generator to, e.g. look ahead on the values to come. Any
+    iterable works, also unbounded ones, as at most n + step values are
+    held at a time. The window moves step values at a time and, if partial,
+    the windows running over the end are yielded shortened.
 
-    Use this generator to, e.g. look ahead on the values to come.
+    For a sequence, e.g. a str or list, windows are slices of it, of the
+    same type. For numpy arrays they are views into the array, see
+    expandMany to get them all at once. For other iterables they are
+    tuples.
 
     Example
     -------
-    >>> for i, j, none* in expand(range(4), 2):
+    >>> for i, j in expand(range(4), 2):
     ...     print(i,j)
     0 1
     1 2
     2 3
-    >>> for i,j,k,*l in expand('abcdefg', 3):
-    ...     print(i,j,k,l)
-    a b c ['d', 'e', 'f', 'g']
-    b c d ['e', 'f', 'g']
-    c d e ['f', 'g']
-    d e f ['g']
-    e f g []
+    >>> list(expand('abcd', 2))
+    ['ab', 'bc', 'cd']
+    >>> for i,*l in expand('abcdefg', 3, partial=True):
+    ...     print(i,l)
+    a ['b', 'c']
+    b ['c', 'd']
+    c ['d', 'e']
+    d ['e', 'f']
+    e ['f', 'g']
+    f ['g']
+    g []
+    >>> list(islice(expand(count(), 3, step=2), 2))
+    [(0, 1, 2), (2, 3, 4)]
+    """
+    if n < 1 or step < 1:
+        raise ValueError('expand needs n and step of at least 1.')
+    if np is not None and isinstance(it, np.ndarray):
+        yield from _expand_np(it, n, step, partial)
+        return
+    if isinstance(it, Sequence):
+        # slicing keeps the type, and costs n per window, not len(it)
+        stop = len(it) if partial else len(it) - n + 1
+        for i in range(0, stop, step):
+            yield it[i:i + n]
+        return
+
+    it = iter(it)
+    window = deque(islice(it, n), maxlen=n)
+    tail = tuple(window)
+    if len(window) == n:
+        yield tail
+        if step == 1:
+            for el in it:
+                window.append(el)
+                yield tuple(window)
+            tail = tuple(window)[1:]
+        else:
+            while len(chunk := tuple(islice(it, step))) == step:
+                window.extend(chunk)
+                yield tuple(window)
+            tail = (*window, *chunk)[step:]
+    while partial and tail:
+        yield tail
+        tail = tail[step:]
+
+def _expand_np(arr, n, step, partial):
+    """The windows of expand over the first axis of arr, as views."""
+    start = 0
+    if len(arr) >= n:
+        windows = expandMany(arr, n, step)
+        yield from windows
+        start = len(windows) * step
+    while partial and start < len(arr):
+        yield arr[start:]
+        start += step
+
+def expandMany(arr, n, step=1):
+    """
+    All full windows of expand(arr, n, step) as one array, without copying.
 
+    The windows run along the first axis, so the result has shape
+    (windows, n, *arr.shape[1:]) and shares memory with arr.
 
+    >>> expandMany(np.arange(5), 3).sum(axis=1)
+    array([3, 6, 9])
     """
-    while len(expd := it[:n]) == n:
-        yield expd
-        it = it[1:]
+    if np is None:
+        raise ImportError('The batch operations requires numpy.')
+    arr = np.asarray(arr)
+    windows = sliding_window_view(arr, n, axis=0)[::step]
+    # sliding_window_view puts the window axis last
+    return np.moveaxis(windows, -1, 1)
 
 def warnLast(obj):
     """
@@ -139,12 +219,125 @@ def warnLast(obj):
 # itertools.combinations
 
 
+_end = object() # Marks an exhausted it
+
+
+class Stage:
+    """
+    A pure stage of a Pipeline, see mapStage, filterStage and batchStage.
+    """
+    __slots__ = ('kind', 'fn', 'size')
+
+    def __init__(self, kind, fn, size=None):
+        self.kind, self.fn, self.size = kind, fn, size
+
+    def __repr__(self):
+        name = getattr(self.fn, '__name__', repr(self.fn))
+        size = '' if self.size is None else f', {self.size}'
+        return f'{self.kind}Stage({name}{size})'
+
+def mapStage(fn):
+    """A stage yielding fn(el) for each el, like map."""
+    return Stage('map', fn)
+
+def filterStage(fn):
+    """A stage yielding the els for which fn(el) is truthy, like filter."""
+    return Stage('filter', fn)
+
+def batchStage(fn, size=256):
+    """
+    A stage calling fn on lists of up to size els at a time.
+
+    fn returns an iterable of results, of any length, which are yielded
+    one by one. Use it where fn is cheaper per el on many els at once,
+    e.g. with numpy.
+    """
+    return Stage('batch', fn, size)
+
+def _batches(it, size):
+    return iter(lambda: list(islice(it, size)), [])
+
+def _counter():
+    # Counts the els passing compress(it, counter) at C speed; read with
+    # _count. Starts at 1 as compress drops els with a falsy selector.
+    return iter(range(1, maxsize))
+
+def _count(counter):
+    return maxsize - 1 - length_hint(counter)
+
+class Pipeline:
+    """
+    Stages composed once into a single it.
+
+    A stage is an (uninitialized) generator, taking an it and returning
+    one, or a pure Stage. The stages are chained up front, without
+    recursion, and the pure ones are run by the builtin map and filter,
+    so a run of them adds no generator frames per el and any number of
+    them may be chained. A generator stage still pulls each el through a
+    frame of its own, so a pipe of more generators than the recursion
+    limit raises RecursionError once iterated.
+
+    Example
+    -------
+        p = Pipeline(g, mapStage(f), filterStage(t), h)
+        p(src) -> h(filter(t, map(f, g(src))))
+
+        p.counts -> [els of src, of g, of map, of filter, of h]
+    """
+    def __init__(self, *stages):
+        self.stages = []
+        for stage in stages:
+            self.stages.extend(stage.stages if isinstance(stage, Pipeline) else [stage])
+        self._counters = []
+
+    def __call__(self, source):
+        # A counter per stage which may change the number of els, a map
+        # stage passes on the count before it
+        counters = [_counter()]
+        it = compress(source, counters[0])
+        for stage in self.stages:
+            if not isinstance(stage, Stage):
+                it = stage(it)
+                if not hasattr(it, '__iter__'):
+                    raise TypeError(f'Expected stage {getattr(stage, "__name__", stage)!r} '
+                                    f'to return an iterable, not {type(it).__name__}; '
+                                    f'a sink goes around the pipe, sink(pipe(...)).')
+            elif stage.kind == 'map':
+                counters.append(None)
+                it = map(stage.fn, it)
+                continue
+            elif stage.kind == 'filter':
+                it = filter(stage.fn, it)
+            else:
+                it = chain.from_iterable(map(stage.fn, _batches(it, stage.size)))
+            counters.append(_counter())
+            it = compress(it, counters[-1])
+        self._counters = counters
+        return it
+
+    def __repr__(self):
+        names = (repr(st) if isinstance(st, Stage) else getattr(st, '__name__', repr(st))
+                 for st in self.stages)
+        return f'Pipeline({", ".join(names)})'
+
+    @property
+    def counts(self):
+        """
+        The number of els each stage yielded so far in the latest run.
+
+        The first is the number taken from the source.
+        """
+        counts = []
+        for counter in self._counters:
+            counts.append(counts[-1] if counter is None else _count(counter))
+        return counts
+
 def pipe(*gs):
     """
     Take multiple (uninitialized) generators and pipe them together.
 
     First argument is original generator and source. Thus best if
-    initialized by user.
+    initialized by user. The other may also be pure Stages, see Pipeline.
 
     Example
     -------
@@ -152,23 +345,68 @@ def pipe(*gs):
 
         Think of this like,
         f(...) | g | h | ...
+
+    As a generator, no stage is called before the first value is taken.
     """
-    gs, last = gs[:-1], gs[-1]
-    yield from last(pipe(*gs)) if gs else last
+    yield from Pipeline(*gs[1:])(gs[0])
 
 def purepipe(*gs):
     """
     Much like pipe but doesn't expect a source in the beginning.
 
-    Returns an uninitialized generator function p(g) where g would
-    be its source generator.
+    Returns a Pipeline p(g) where g would be its source generator.
 
     Example
     -------
         p = purepipe(f1, f2)
         p(g(...)) -> f2(f1(g(...)))
     """
-    return lambda g: (yield from pipe(g, *gs))
+    return Pipeline(*gs)
+
+def _mapchunk(fn, chunk):
+    return list(map(fn, chunk))
+
+def parallelMap(fn, workers=None, chunksize=1, processes=False, inflight=None):
+    """
+    A stage yielding fn(el) for each el, computed on a pool of workers.
+
+    The els are sent to a thread pool, or a process pool if processes, in
+    chunks of chunksize and yielded in order. At most inflight chunks,
+    by default twice the workers, are pending at a time, so a slow
+    consumer holds back the source. An exception raised by fn is raised
+    to the consumer, and the pool is shut down once the stage is done,
+    fails or is closed early.
+
+    Threads only help where fn releases the GIL, e.g. zlib or numpy. For
+    processes fn must be picklable and chunksize large enough to pay for
+    the transfer.
+
+    Example
+    -------
+        sink(pipe(readblocks(...), parallelMap(decode, workers=4)))
+    """
+    workers = workers or cpu_count() or 1
+    inflight = inflight or 2 * workers
+    Pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+
+    def stage(it):
+        chunks = _batches(iter(it), chunksize)
+        pending = deque()
+        pool = Pool(workers)
+        try:
+            for chunk in islice(chunks, inflight):
+                pending.append(pool.submit(_mapchunk, fn, chunk))
+            while pending:
+                results = pending.popleft().result()
+                # Refill before yielding, so the workers don't idle on us
+                for chunk in islice(chunks, 1):
+                    pending.append(pool.submit(_mapchunk, fn, chunk))
+                yield from results
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    stage.__name__ = f'parallelMap({getattr(fn, "__name__", repr(fn))})'
+    return stage
 
 def meld(*gs):
     """
@@ -186,14 +424,55 @@ def meld(*gs):
         it 3: 'mnopqrs'
 
         output: 'abcdirs'
+
+    Any iterables work; all are advanced together, one value each per
+    step, and dropped once exhausted.
     """
-    N = 0 # Max common length
-    for els in zip(*gs):
-        N += 1
-        yield els[0]
-    if gs := [it[N:] for it in gs if N < len(it)]:
-        yield from meld(*gw)
-        
+    its = [iter(g) for g in gs]
+    while its:
+        heads = [next(it, _end) for it in its]
+        its = [it for it, head in zip(its, heads) if head is not _end]
+        for head in heads:
+            if head is not _end:
+                yield head
+                break
+
+def merge(*gs, key=None, unique=False):
+    """
+    Merge sorted its to a single sorted it with left-most argument priority.
+
+    Like heapq.merge, a k-way merge that holds one value per it. Values
+    with equal keys come out in argument order and, if unique, only the
+    first of them, i.e. the one of the most prioritized it, is kept.
+
+    Example
+    -------
+        it 0: [(1, 'a'), (3, 'a')]
+        it 1: [(1, 'b'), (2, 'b'), (3, 'b')]
+
+        merge(it0, it1, key=itemgetter(0), unique=True)
+        output: [(1, 'a'), (2, 'b'), (3, 'a')]
+    """
+    key = key or (lambda el: el)
+    heap = []
+    for i, it in enumerate(map(iter, gs)):
+        for el in it:
+            # i breaks ties, so the values themselves are never compared
+            heap.append((key(el), i, el, it))
+            break
+    heapify(heap)
+    last = _end
+    while heap:
+        k, i, el, it = heap[0]
+        if not unique or last is _end or k != last:
+            yield el
+        last = k
+        for el in it:
+            heapreplace(heap, (key(el), i, el, it))
+            break
+        else:
+            heappop(heap)
+
 def gobble(sequence, indices):
     """
     Gobble up one segment at a time.
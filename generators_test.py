@@ -0,0 +1,181 @@
+#! /usr/bin/env python3
+
+from unittest import TestCase, main, skipIf
+from itertools import count, islice
+from heapq import merge as heapmerge
+from operator import itemgetter
+import random
+import sys
+
+from generators import expand, expandMany, meld, merge, np
+from generators import Pipeline, pipe, purepipe, mapStage, filterStage, batchStage, parallelMap, sink
+
+
+class EXPAND(TestCase):
+    def test(self):
+        seq = list(range(10))
+        for n in range(1, 5):
+            for step in range(1, 6):
+                with self.subTest(n=n, step=step):
+                    full = [seq[i:i+n] for i in range(0, len(seq) - n + 1, step)]
+                    part = [seq[i:i+n] for i in range(0, len(seq), step)]
+                    self.assertEqual(list(expand(seq, n, step)), full)
+                    self.assertEqual(list(expand(seq, n, step, partial=True)), part)
+                    self.assertEqual(list(expand(iter(seq), n, step)), list(map(tuple, full)))
+                    self.assertEqual(list(expand(iter(seq), n, step, partial=True)),
+                                     list(map(tuple, part)))
+
+    def test_type(self):
+        # sequences give slices of their own type, other iterables tuples
+        self.assertEqual(list(expand('abcd', 2)), ['ab', 'bc', 'cd'])
+        self.assertEqual(list(expand(b'abc', 2, partial=True)), [b'ab', b'bc', b'c'])
+        self.assertEqual(list(expand((1, 2, 3), 2)), [(1, 2), (2, 3)])
+        self.assertEqual(list(expand(iter('abc'), 2)), [('a', 'b'), ('b', 'c')])
+
+    def test_short(self):
+        self.assertEqual(list(expand('ab', 3)), [])
+        self.assertEqual(list(expand('ab', 3, partial=True)), ['ab', 'b'])
+        self.assertEqual(list(expand(iter('ab'), 3, partial=True)), [('a', 'b'), ('b',)])
+        self.assertEqual(list(expand('', 3, partial=True)), [])
+
+    def test_unbounded(self):
+        self.assertEqual(list(islice(expand(count(), 3, step=2), 3)),
+                         [(0, 1, 2), (2, 3, 4), (4, 5, 6)])
+
+    @skipIf(np is None, 'requires numpy')
+    def test_numpy(self):
+        arr = np.arange(10)
+        for n in range(1, 5):
+            for step in range(1, 6):
+                with self.subTest(n=n, step=step):
+                    windows = list(expand(arr, n, step, partial=True))
+                    self.assertEqual([tuple(w.tolist()) for w in windows],
+                                     list(expand(iter(range(10)), n, step, partial=True)))
+                    self.assertTrue(all(np.shares_memory(w, arr) for w in windows))
+        many = expandMany(np.arange(12).reshape(6, 2), 3, 2)
+        self.assertEqual(many.shape, (2, 3, 2))
+        self.assertEqual(many[1].tolist(), [[4, 5], [6, 7], [8, 9]])
+
+
+class MELD(TestCase):
+    def test(self):
+        self.assertEqual(''.join(meld('abcd', 'efghi', 'jkl', 'mnopqrs')), 'abcdirs')
+        self.assertEqual(''.join(meld(iter('ab'), (c for c in 'xyz'))), 'abz')
+        self.assertEqual(list(meld()), [])
+        self.assertEqual(list(meld([], 'ab')), ['a', 'b'])
+
+    def test_many(self):
+        # one source per depth would have hit the recursion limit before
+        gs = [range(i) for i in range(2000)]
+        self.assertEqual(list(meld(*gs)), list(range(1999)))
+
+
+class MERGE(TestCase):
+    def test(self):
+        random.seed(0)
+        gs = [sorted(random.choices(range(50), k=random.randrange(20))) for _ in range(12)]
+        self.assertEqual(list(merge(*gs)), list(heapmerge(*gs)))
+        self.assertEqual(list(merge(*map(iter, gs), unique=True)),
+                         sorted(set().union(*gs)))
+
+    def test_priority(self):
+        a = [(1, 'a'), (3, 'a')]
+        b = [(1, 'b'), (2, 'b'), (3, 'b')]
+        self.assertEqual(list(merge(a, b, key=itemgetter(0))),
+                         [(1, 'a'), (1, 'b'), (2, 'b'), (3, 'a'), (3, 'b')])
+        self.assertEqual(list(merge(b, a, key=itemgetter(0), unique=True)),
+                         [(1, 'b'), (2, 'b'), (3, 'b')])
+
+
+def inc(it):
+    for el in it:
+        yield el + 1
+
+class PIPELINE(TestCase):
+    def test(self):
+        self.assertEqual(list(pipe(range(3), inc, inc)), [2, 3, 4])
+        self.assertEqual(list(pipe('ab')), ['a', 'b'])
+        p = purepipe(inc, mapStage(str))
+        self.assertEqual(list(p(range(3))), ['1', '2', '3'])
+        self.assertEqual(list(p(range(2))), ['1', '2'])
+
+    def test_lazy(self):
+        calls = []
+        def stage(it):
+            calls.append(1)
+            return it
+        it = pipe(range(3), stage)
+        self.assertEqual(calls, [])
+        self.assertEqual(list(it), [0, 1, 2])
+        self.assertEqual(calls, [1])
+
+    def test_sink(self):
+        with self.assertRaisesRegex(TypeError, 'sink'):
+            Pipeline(sink)(range(3))
+        with self.assertRaisesRegex(TypeError, 'sink'):
+            list(pipe(range(3), sink))
+
+    def test_stages(self):
+        p = Pipeline(inc, mapStage(lambda x: x * 2), filterStage(lambda x: x % 3),
+                     batchStage(lambda b: [sum(b)], 2))
+        self.assertEqual(list(p(range(6))), [2 + 4, 8 + 10])
+        self.assertEqual(p.counts, [6, 6, 6, 4, 2])
+        self.assertEqual(list(Pipeline(p, inc)(range(6))), [7, 19])
+
+    def test_counts(self):
+        p = Pipeline(filterStage(bool), mapStage(str))
+        it = p(count())
+        self.assertEqual(list(islice(it, 3)), ['1', '2', '3'])
+        self.assertEqual(p.counts, [4, 3, 3])
+
+    def test_long(self):
+        # pure stages don't nest frames, so their number is not limited
+        depth = 2 * sys.getrecursionlimit()
+        p = Pipeline(*[inc] * 400, *[mapStage(abs), filterStage(None)] * depth)
+        self.assertEqual(list(p(range(3))), [400, 401, 402])
+        self.assertEqual(p.counts[-1], 3)
+
+    def test_long_generators(self):
+        # generators do nest, one frame per stage per el
+        it = pipe(range(3), *[inc] * (2 * sys.getrecursionlimit()))
+        self.assertRaises(RecursionError, list, it)
+
+
+def fails(el):
+    if el == 5:
+        raise ValueError(el)
+    return el
+
+class PARALLEL_MAP(TestCase):
+    def test(self):
+        for chunksize in (1, 3, 100):
+            with self.subTest(chunksize=chunksize):
+                stage = parallelMap(abs, workers=3, chunksize=chunksize)
+                self.assertEqual(list(pipe(range(0, -50, -1), stage)), list(range(50)))
+        self.assertEqual(list(pipe([], parallelMap(abs))), [])
+
+    def test_processes(self):
+        stage = parallelMap(abs, workers=2, chunksize=8, processes=True)
+        self.assertEqual(list(pipe(range(0, -50, -1), stage)), list(range(50)))
+
+    def test_exception(self):
+        it = pipe(range(10), parallelMap(fails, workers=2))
+        self.assertEqual(list(islice(it, 5)), [0, 1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            next(it)
+
+    def test_early_stop(self):
+        # only the inflight chunks are taken from an endless source
+        p = Pipeline(parallelMap(abs, workers=2, chunksize=2, inflight=3))
+        it = p(count())
+        self.assertEqual(list(islice(it, 3)), [0, 1, 2])
+        del it
+        self.assertLessEqual(p.counts[0], 2 * (3 + 2))
+        stage = parallelMap(abs, workers=2)(count())
+        self.assertEqual(next(stage), 0)
+        stage.close()
+        self.assertEqual(list(stage), [])
+
+
+if __name__ == '__main__':
+    main()